@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Measure memory held by parsed model objects with tracemalloc.
+
+Reports the bytes retained per Part and per Technology (including its
+attribute storage) beyond the XML element tree they were built from.
+
+Run from the repository root: ./benchmarks/bench_memory.py
+"""
+import argparse
+import io
+import os
+import sys
+import tracemalloc
+from typing import Callable, List
+from xml.etree.ElementTree import Element
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from eagletools.parser import Part, Technology, load_file  # noqa: E402
+
+import synth  # noqa: E402
+
+
+def _retained(elements: List[Element],
+              build: Callable[[Element], object]) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(e) for e in elements]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / len(elements)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--libraries', type=int, default=10)
+    ap.add_argument('--devicesets', type=int, default=500)
+    ap.add_argument('--parts', type=int, default=50000)
+    args = ap.parse_args()
+
+    buf = io.StringIO()
+    synth.write_schematic(buf, args.libraries, args.devicesets, args.parts)
+    buf.seek(0)
+    _, _, schematic = load_file(buf)
+
+    parts = list(schematic.iterfind('./parts/part'))
+    techs = list(schematic.iterfind(
+        './libraries/library/devicesets/deviceset/devices/device/'
+        'technologies/technology'))
+    print('Part        {:8.1f} bytes/object ({} objects)'.format(
+        _retained(parts, Part.from_et), len(parts)))
+    print('Technology  {:8.1f} bytes/object ({} objects)'.format(
+        _retained(techs, Technology.from_et), len(techs)))
+
+
+if __name__ == '__main__':
+    main()
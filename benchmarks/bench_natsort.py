@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Time natural sorting of reference designators.
+
+Compares eagletools.natsort.natural_key, cold and with its key cache warm,
+against the regex key the CLI used before.
+
+Run from the repository root: ./benchmarks/bench_natsort.py
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from eagletools.natsort import natural_key  # noqa: E402
+
+PREFIXES = ['R', 'C', 'U', 'L', 'D', 'Q', 'J', 'TP', 'FB', 'SW']
+
+
+def _designators(count: int) -> List[str]:
+    rng = random.Random(0)
+    names = []
+    for i in range(count):
+        name = '{}{}'.format(PREFIXES[i % len(PREFIXES)], i // len(PREFIXES))
+        # A few multi-unit and hierarchical names
+        if i % 17 == 0:
+            name += 'ABCD'[i % 4]
+        elif i % 23 == 0:
+            name += '.{}'.format(i % 5)
+        names.append(name)
+    rng.shuffle(names)
+    return names
+
+
+def _regex_key(name: str) -> Tuple[str, int]:
+    match = re.fullmatch(r'([A-Z]+)([0-9]+)', name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return name, 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--count', type=int, default=100000)
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+
+    names = _designators(args.count)
+
+    def cold() -> None:
+        natural_key.cache_clear()
+        sorted(names, key=natural_key)
+
+    def warm() -> None:
+        sorted(names, key=natural_key)
+
+    cases = [
+        ('regex (old)', lambda: sorted(names, key=_regex_key)),
+        ('natural, cold', cold),
+        ('natural, warm', warm),
+    ]
+    warm()
+    for label, run in cases:
+        best = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print('{:<14} {:8d} names {:8.3f} s'.format(label, len(names), best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Time parse_file on large synthetic libraries and schematics.
+
+Run from the repository root: ./benchmarks/bench_parse.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from eagletools.parser import parse_file  # noqa: E402
+from eagletools.xmlbackend import available_backends  # noqa: E402
+
+import synth  # noqa: E402
+
+
+def _bench(path: str, backend: str, streaming: bool, repeat: int) -> float:
+    def run() -> None:
+        with open(path) as f:
+            parse_file(f, streaming=streaming, backend=backend)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--devicesets', type=int, default=5000)
+    ap.add_argument('--libraries', type=int, default=30)
+    ap.add_argument('--parts', type=int, default=5000)
+    ap.add_argument('--signals', type=int, default=5000)
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--backend', action='append', choices=available_backends(),
+                    help="XML backend to time (default all available)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lbr = os.path.join(tmp, 'big.lbr')
+        with open(lbr, 'w') as f:
+            synth.write_library(f, args.devicesets)
+        sch = os.path.join(tmp, 'big.sch')
+        with open(sch, 'w') as f:
+            synth.write_schematic(f, args.libraries,
+                                  args.devicesets // args.libraries,
+                                  args.parts)
+        brd = os.path.join(tmp, 'big.brd')
+        with open(brd, 'w') as f:
+            synth.write_board(f, args.libraries,
+                              args.devicesets // args.libraries,
+                              args.parts, args.signals)
+        for path in (lbr, sch, brd):
+            size = os.path.getsize(path) / 1e6
+            for backend in args.backend or available_backends():
+                for streaming in (False, True):
+                    best = _bench(path, backend, streaming, args.repeat)
+                    print('{:<10} {:7.1f} MB  {:<10} {:<9} {:8.3f} s'.format(
+                        os.path.basename(path), size, backend,
+                        'streaming' if streaming else 'tree', best))
+
+
+if __name__ == '__main__':
+    main()
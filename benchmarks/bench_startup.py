@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Check CLI startup cost against a budget.
+
+Measures the cumulative import time of eagletools.cli with
+`python -X importtime` (best of several runs), and checks that importing it
+doesn't pull in modules that only individual commands need. Exits non-zero
+if either check fails, so it can gate CI.
+
+Run from the repository root: ./benchmarks/bench_startup.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODULE = 'eagletools.cli'
+
+# Modules that must only be imported by the commands that use them
+DEFERRED = [
+    'asyncio',
+    'concurrent.futures',
+    'defusedxml',
+    'eagletools.parser',
+    'hwpy',
+    'lxml',
+    'tabulate',
+    'xml.etree.ElementTree',
+]
+
+DEFAULT_BUDGET_MS = 100
+
+
+def _python(*args: str) -> 'subprocess.CompletedProcess[str]':
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [p for p in [env.get('PYTHONPATH')] if p])
+    return subprocess.run([sys.executable] + list(args), env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+def _import_time_us() -> int:
+    # The last line of -X importtime output is the requested module:
+    # "import time: <self us> | <cumulative us> | <name>"
+    stderr = _python('-X', 'importtime', '-c', 'import ' + MODULE).stderr
+    for line in reversed(stderr.splitlines()):
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == MODULE:
+            return int(fields[1])
+    raise RuntimeError('No import time reported for ' + MODULE)
+
+
+def _loaded_deferred() -> List[str]:
+    code = ('import sys, {0}\n'
+            'for name in {1!r}:\n'
+            '    if name in sys.modules:\n'
+            '        print(name)\n').format(MODULE, DEFERRED)
+    return _python('-c', code).stdout.split()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--repeat', type=int, default=7)
+    ap.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                    help="Maximum cumulative import time of {} (default "
+                         "{} ms)".format(MODULE, DEFAULT_BUDGET_MS))
+    args = ap.parse_args()
+
+    best = min(_import_time_us() for _ in range(args.repeat)) / 1000
+    print('import {:<16} {:8.1f} ms  (budget {:.0f} ms)'.format(
+        MODULE, best, args.budget_ms))
+    failed = best > args.budget_ms
+    for name in _loaded_deferred():
+        print('{} is imported at startup'.format(name))
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Time and peak memory of the main library functions and CLI commands.
+
+Generates synthetic .lbr, .sch and .brd files at the chosen scale, then
+runs each case in a fresh interpreter: best wall time over --repeat runs,
+and peak RSS above the interpreter's baseline after imports. Everything
+runs offline; the parse cache is never used.
+
+Run from the repository root: ./benchmarks/suite.py --scale small
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import synth  # noqa: E402
+
+SCALES = {
+    'small': {'libraries': 5, 'devicesets': 50, 'parts': 500,
+              'signals': 500},
+    'medium': {'libraries': 30, 'devicesets': 170, 'parts': 5000,
+               'signals': 5000},
+    'large': {'libraries': 60, 'devicesets': 300, 'parts': 20000,
+              'signals': 20000},
+}
+
+
+class Case(NamedTuple):
+    name: str
+    file_type: str
+    run: Callable[[str], None]
+
+
+def _load_file(path: str) -> None:
+    from eagletools.parser import load_file
+    load_file(path)
+
+
+def _parse_tree(path: str) -> None:
+    from eagletools.parser import parse_file
+    parse_file(path)
+
+
+def _parse_streaming(path: str) -> None:
+    from eagletools.parser import parse_file
+    parse_file(path, streaming=True)
+
+
+def _command(*args: str) -> Callable[[str], None]:
+    def run(path: str) -> None:
+        from eagletools.cli import cli
+        stdout = sys.stdout
+        with open(os.devnull, 'w') as devnull:
+            sys.stdout = devnull
+            try:
+                cli.main(['--no-cache'] + list(args) + [path],
+                         prog_name='eagletools', standalone_mode=False)
+            finally:
+                sys.stdout = stdout
+    return run
+
+
+def _extract(path: str) -> None:
+    # A fresh directory each run, since unchanged outputs aren't rewritten
+    with tempfile.TemporaryDirectory() as output:
+        _command('extract', '-o', output)(path)
+
+
+CASES = [
+    Case('load_file', 'lbr', _load_file),
+    Case('load_file', 'sch', _load_file),
+    Case('load_file', 'brd', _load_file),
+    Case('parse_file', 'lbr', _parse_tree),
+    Case('parse_file', 'sch', _parse_tree),
+    Case('parse_file', 'brd', _parse_tree),
+    Case('parse_file streaming', 'sch', _parse_streaming),
+    Case('parse_file streaming', 'brd', _parse_streaming),
+    Case('extract', 'sch', _extract),
+    Case('extract', 'brd', _extract),
+    Case('list', 'lbr', _command('list')),
+    Case('parts', 'sch', _command('parts')),
+]
+
+
+def _have(module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def _run_case(index: int, path: str, repeat: int) -> None:
+    # Child process: import everything the case needs before taking the
+    # memory baseline, then report as JSON on stdout
+    case = CASES[index]
+    import eagletools.cli  # noqa: F401
+    import eagletools.parser  # noqa: F401
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(path)
+        times.append(time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    json.dump({'seconds': min(times), 'peak_kb': peak - baseline},
+              sys.stdout)
+
+
+def _generate(directory: str, scale: Dict[str, int]) -> Dict[str, str]:
+    paths = {}
+    for file_type in ('lbr', 'sch', 'brd'):
+        path = paths[file_type] = os.path.join(directory,
+                                               'bench.' + file_type)
+        with open(path, 'w', encoding='utf-8') as out:
+            if file_type == 'lbr':
+                synth.write_library(out, scale['devicesets'] *
+                                    scale['libraries'])
+            elif file_type == 'sch':
+                synth.write_schematic(out, scale['libraries'],
+                                      scale['devicesets'], scale['parts'])
+            else:
+                synth.write_board(out, scale['libraries'],
+                                  scale['devicesets'], scale['parts'],
+                                  scale['signals'])
+    return paths
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--scale', choices=sorted(SCALES), default='medium')
+    for name in ('libraries', 'devicesets', 'parts', 'signals'):
+        ap.add_argument('--' + name, type=int,
+                        help="Override the scale's {}".format(name))
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--case', action='append',
+                    help="Only run cases whose name contains this")
+    ap.add_argument('--json', metavar='PATH',
+                    help="Also write results to PATH as JSON")
+    ap.add_argument('--run', nargs=2, metavar=('INDEX', 'PATH'),
+                    help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run:
+        _run_case(int(args.run[0]), args.run[1], args.repeat)
+        return
+
+    scale = dict(SCALES[args.scale])
+    for name in scale:
+        if getattr(args, name) is not None:
+            scale[name] = getattr(args, name)
+
+    results: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _generate(tmp, scale)
+        for index, case in enumerate(CASES):
+            if args.case and not any(c in case.name for c in args.case):
+                continue
+            path = paths[case.file_type]
+            label = '{} ({})'.format(case.name, case.file_type)
+            if case.name == 'parts' and not _have('hwpy'):
+                print('{:<28} skipped: hwpy not installed'.format(label))
+                continue
+            proc = subprocess.run(
+                [sys.executable, __file__, '--repeat', str(args.repeat),
+                 '--run', str(index), path],
+                stdout=subprocess.PIPE, check=True)
+            result = json.loads(proc.stdout.decode('utf-8'))
+            size = os.path.getsize(path) / 1e6
+            print('{:<28} {:7.1f} MB  {:8.3f} s  {:8.1f} MB peak'.format(
+                label, size, result['seconds'], result['peak_kb'] / 1024))
+            results.append({'case': case.name, 'file': case.file_type,
+                            'file_bytes': os.path.getsize(path), **result})
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'scale': scale, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Synthetic EAGLE file generator for benchmarks.
+
+Also usable from the command line to write a file at a given scale, e.g.
+./benchmarks/synth.py sch big.sch --libraries 30 --devicesets 200
+"""
+import argparse
+from typing import TextIO
+from xml.sax.saxutils import quoteattr
+
+HEADER = '''<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE eagle SYSTEM "eagle.dtd">
+<eagle version="9.2.2">
+<drawing>
+<settings>
+<setting alwaysvectorfont="no"/>
+<setting verticaltext="up"/>
+</settings>
+<grid distance="0.1" unitdist="inch" unit="inch" style="lines" multiple="1" \
+display="no" altdistance="0.01" altunitdist="inch" altunit="inch"/>
+<layers>
+<layer number="1" name="Top" color="4" fill="1" visible="yes" active="yes"/>
+<layer number="16" name="Bottom" color="1" fill="1" visible="yes" active="yes"/>
+<layer number="94" name="Symbols" color="4" fill="1" visible="yes" active="yes"/>
+</layers>
+'''
+FOOTER = '''</drawing>
+</eagle>
+'''
+
+# Reference designator prefixes, assigned to devicesets in turn
+PREFIXES = ['R', 'C', 'U', 'L', 'D', 'Q', 'J', 'FB']
+
+VALUES = ['10', '47', '100', '1k', '4.7k', '10k', '47k', '100k', '1M',
+          '10p', '100p', '1n', '10n', '100n', '1u', '10u']
+
+
+def _attr(value: str) -> str:
+    return quoteattr(value)
+
+
+def _prefix(deviceset: int) -> str:
+    return PREFIXES[deviceset % len(PREFIXES)]
+
+
+def _part_name(part: int, devicesets: int) -> str:
+    return '{}{}'.format(_prefix(part % devicesets), part + 1)
+
+
+def write_library_body(out: TextIO, name: str, devicesets: int,
+                       variants: int=2, technologies: int=2) -> None:
+    out.write('<description>Synthetic library {}</description>\n'.format(name))
+    out.write('<packages>\n')
+    for v in range(variants):
+        out.write('<package name="PKG{0}">\n'
+                  '<description>Package {0}</description>\n'
+                  '<smd name="1" x="-0.5" y="0" dx="0.6" dy="0.5" layer="1"/>\n'
+                  '<smd name="2" x="0.5" y="0" dx="0.6" dy="0.5" layer="1"/>\n'
+                  '<wire x1="-1" y1="0.5" x2="1" y2="0.5" width="0.127" layer="21"/>\n'
+                  '<text x="0" y="1" size="1" layer="25">&gt;NAME</text>\n'
+                  '</package>\n'.format(v))
+    out.write('</packages>\n<symbols>\n')
+    out.write('<symbol name="SYM">\n'
+              '<wire x1="-2.54" y1="0" x2="2.54" y2="0" width="0.254" layer="94"/>\n'
+              '<pin name="1" x="-5.08" y="0" visible="off" length="short"/>\n'
+              '<pin name="2" x="5.08" y="0" visible="off" length="short" rot="R180"/>\n'
+              '</symbol>\n')
+    out.write('</symbols>\n<devicesets>\n')
+    for d in range(devicesets):
+        out.write('<deviceset name="DEV{0}" prefix="{2}" uservalue="yes">\n'
+                  '<description>Device {0} of {1}</description>\n'
+                  '<gates>\n<gate name="G$1" symbol="SYM" x="0" y="0"/>\n</gates>\n'
+                  '<devices>\n'.format(d, name, _prefix(d)))
+        for v in range(variants):
+            out.write('<device name="-V{0}" package="PKG{0}">\n'
+                      '<connects>\n'
+                      '<connect gate="G$1" pin="1" pad="1"/>\n'
+                      '<connect gate="G$1" pin="2" pad="2"/>\n'
+                      '</connects>\n<technologies>\n'.format(v))
+            for t in range(technologies):
+                out.write('<technology name="T{0}">\n'
+                          '<attribute name="MPN" value="MPN-{1}-{2}-{0}"/>\n'
+                          '<attribute name="MF" value="Maker"/>\n'
+                          '</technology>\n'.format(t, d, v))
+            out.write('</technologies>\n</device>\n')
+        out.write('</devices>\n</deviceset>\n')
+    out.write('</devicesets>\n')
+
+
+def write_library(out: TextIO, devicesets: int, variants: int=2,
+                  technologies: int=2) -> None:
+    """Write a standalone .lbr file"""
+    out.write(HEADER)
+    out.write('<library>\n')
+    write_library_body(out, 'lbr', devicesets, variants, technologies)
+    out.write('</library>\n')
+    out.write(FOOTER)
+
+
+def write_schematic(out: TextIO, libraries: int, devicesets: int, parts: int,
+                    variants: int=2, technologies: int=2) -> None:
+    """Write a .sch file with embedded libraries and parts using them"""
+    out.write(HEADER)
+    out.write('<schematic xreflabel="%F%N/%S.%C%R" xrefpart="/%S.%C%R">\n'
+              '<description>Synthetic schematic</description>\n'
+              '<libraries>\n')
+    for lib in range(libraries):
+        name = 'lib{}'.format(lib)
+        out.write('<library name={} urn={}>\n'.format(
+            _attr(name), _attr('urn:adsk.eagle:library:{}'.format(lib))))
+        write_library_body(out, name, devicesets, variants, technologies)
+        out.write('</library>\n')
+    out.write('</libraries>\n<attributes>\n</attributes>\n'
+              '<variantdefs>\n</variantdefs>\n<classes>\n'
+              '<class number="0" name="default" width="0" drill="0">\n</class>\n'
+              '</classes>\n<parts>\n')
+    for p in range(parts):
+        lib = p % libraries
+        out.write('<part name="{}" library="lib{}" library_urn={} '
+                  'deviceset="DEV{}" device="-V{}" technology="T{}" '
+                  'value={}/>\n'.format(
+                      _part_name(p, devicesets), lib,
+                      _attr('urn:adsk.eagle:library:{}'.format(lib)),
+                      p % devicesets, p % variants, p % technologies,
+                      _attr(VALUES[p % len(VALUES)])))
+    out.write('</parts>\n<sheets>\n<sheet>\n<plain>\n</plain>\n<instances>\n')
+    for p in range(parts):
+        out.write('<instance part="{}" gate="G$1" x="{}" y="{}"/>\n'.format(
+            _part_name(p, devicesets), (p % 100) * 2.54, (p // 100) * 2.54))
+    out.write('</instances>\n<busses>\n</busses>\n<nets>\n</nets>\n'
+              '</sheet>\n</sheets>\n</schematic>\n')
+    out.write(FOOTER)
+
+
+def write_board(out: TextIO, libraries: int, devicesets: int, elements: int,
+                signals: int, wires_per_signal: int=20,
+                variants: int=2) -> None:
+    """Write a .brd file with placed elements and routed signals"""
+    out.write(HEADER)
+    out.write('<board>\n<plain>\n'
+              '<wire x1="0" y1="0" x2="100" y2="0" width="0" layer="20"/>\n'
+              '<wire x1="100" y1="0" x2="100" y2="80" width="0" layer="20"/>\n'
+              '<wire x1="100" y1="80" x2="0" y2="80" width="0" layer="20"/>\n'
+              '<wire x1="0" y1="80" x2="0" y2="0" width="0" layer="20"/>\n'
+              '<hole x="3" y="3" drill="3.2"/>\n'
+              '<hole x="97" y="77" drill="3.2"/>\n'
+              '<text x="50" y="-2" size="1.27" layer="21">Synthetic</text>\n'
+              '</plain>\n<libraries>\n')
+    for lib in range(libraries):
+        name = 'lib{}'.format(lib)
+        out.write('<library name={} urn={}>\n'.format(
+            _attr(name), _attr('urn:adsk.eagle:library:{}'.format(lib))))
+        write_library_body(out, name, devicesets, variants, 1)
+        out.write('</library>\n')
+    out.write('</libraries>\n<attributes>\n</attributes>\n'
+              '<variantdefs>\n</variantdefs>\n<classes>\n'
+              '<class number="0" name="default" width="0" drill="0">\n</class>\n'
+              '</classes>\n<designrules name="default">\n'
+              '<param name="layerSetup" value="(1*16)"/>\n</designrules>\n'
+              '<elements>\n')
+    for e in range(elements):
+        lib = e % libraries
+        out.write('<element name="U{}" library="lib{}" library_urn={} '
+                  'package="PKG{}" value={} x="{:.2f}" y="{:.2f}"{}>\n'
+                  '<attribute name="MPN" value="MPN-{}" x="0" y="0" '
+                  'size="1.27" layer="27" display="off"/>\n'
+                  '</element>\n'.format(
+                      e + 1, lib,
+                      _attr('urn:adsk.eagle:library:{}'.format(lib)),
+                      e % variants, _attr(VALUES[e % len(VALUES)]),
+                      (e % 50) * 2.0, (e // 50) * 2.0,
+                      ' rot="R90"' if e % 3 == 0 else '', e))
+    out.write('</elements>\n<signals>\n')
+    for s in range(signals):
+        out.write('<signal name="N${}">\n'.format(s + 1))
+        for c in range(2):
+            out.write('<contactref element="U{}" pad="{}"/>\n'.format(
+                (s + c) % elements + 1, c + 1))
+        x, y = (s % 50) * 2.0, (s // 50) * 2.0
+        for w in range(wires_per_signal):
+            out.write('<wire x1="{:.3f}" y1="{:.3f}" x2="{:.3f}" y2="{:.3f}" '
+                      'width="0.2" layer="{}"/>\n'.format(
+                          x, y, x + 0.5, y + 0.25, 1 if w % 2 else 16))
+            x, y = x + 0.5, y + 0.25
+        out.write('<via x="{:.3f}" y="{:.3f}" extent="1-16" drill="0.3"/>\n'
+                  '</signal>\n'.format(x, y))
+    out.write('</signals>\n</board>\n')
+    out.write(FOOTER)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('type', choices=['lbr', 'sch', 'brd'])
+    ap.add_argument('output')
+    ap.add_argument('--libraries', type=int, default=30)
+    ap.add_argument('--devicesets', type=int, default=170,
+                    help="Devicesets per library")
+    ap.add_argument('--parts', type=int, default=5000,
+                    help="Parts (schematic) or elements (board)")
+    ap.add_argument('--signals', type=int, default=5000)
+    ap.add_argument('--wires-per-signal', type=int, default=20)
+    ap.add_argument('--variants', type=int, default=2)
+    ap.add_argument('--technologies', type=int, default=2)
+    args = ap.parse_args()
+
+    with open(args.output, 'w', encoding='utf-8') as out:
+        if args.type == 'lbr':
+            write_library(out, args.devicesets, args.variants,
+                          args.technologies)
+        elif args.type == 'sch':
+            write_schematic(out, args.libraries, args.devicesets, args.parts,
+                            args.variants, args.technologies)
+        else:
+            write_board(out, args.libraries, args.devicesets, args.parts,
+                        args.signals, args.wires_per_signal, args.variants)
+
+
+if __name__ == '__main__':
+    main()
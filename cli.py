@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from eagletools.cli import cli
+from eagletools.client import main
 
 if __name__ == '__main__':
-    cli()
+    main()
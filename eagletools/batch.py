@@ -0,0 +1,111 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, Iterator, NamedTuple, Optional, Tuple, Union, TYPE_CHECKING
+
+from . import timing
+from .parser import Board, Library, Schematic, _count_model, parse_file
+
+if TYPE_CHECKING:
+    from .cache import ParseCache
+
+Path = Union[str, 'os.PathLike[str]']
+Model = Union[Board, Library, Schematic]
+
+
+class ParseResult(NamedTuple):
+    path: Path
+    model: Optional[Model]
+    error: Optional[Exception]
+
+
+def _parse_one(path: Path, streaming: bool, cache: Optional['ParseCache'],
+               backend: Optional[str], include: Optional[FrozenSet[str]]) \
+        -> ParseResult:
+    try:
+        model = parse_file(path, streaming=streaming, cache=cache,
+                           backend=backend, include=include)
+    except Exception as e:
+        return ParseResult(path, None, e)
+    return ParseResult(path, model, None)
+
+
+def _collect(path: Path, future: 'Future[ParseResult]') -> ParseResult:
+    # Errors raised outside _parse_one (a crashed worker, an unpicklable
+    # result) are still reported against the file that caused them
+    try:
+        result = future.result()
+    except Exception as e:
+        return ParseResult(path, None, e)
+    # Counts recorded in a worker stay there, so count again here
+    if result.model is not None and timing.enabled():
+        _count_model(result.model)
+    return result
+
+
+def parse_files(paths: Iterable[Path], jobs: Optional[int]=None,
+                ordered: bool=False,
+                progress: Optional[Callable[[int, int], None]]=None,
+                streaming: bool=False, cache: Optional['ParseCache']=None,
+                backend: Optional[str]=None,
+                include: Optional[Iterable[str]]=None) \
+        -> Iterator[ParseResult]:
+    """Parse many files with a pool of worker processes
+
+    Results are yielded as files finish, or in input order if ordered is
+    set. A file that fails to parse yields a result with its exception
+    rather than stopping the batch. progress, if given, is called with
+    (files done, total files) after each result. include is passed on to
+    parse_file().
+
+    At most a few files per worker are in flight at once, so memory use
+    is bounded by how fast results are consumed, not by len(paths).
+    """
+    paths = list(paths)
+    total = len(paths)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    options = (streaming, cache, backend,
+               None if include is None else frozenset(include))
+
+    if jobs == 1 or total <= 1:
+        for done, path in enumerate(paths, 1):
+            result = _parse_one(path, *options)
+            if progress is not None:
+                progress(done, total)
+            yield result
+        return
+
+    todo = iter(paths)
+    window = jobs * 2
+    with ProcessPoolExecutor(max_workers=min(jobs, total)) as executor:
+        def submit(path: Path) -> 'Future[ParseResult]':
+            return executor.submit(_parse_one, path, *options)
+
+        done = 0
+        if ordered:
+            queue: Deque[Tuple[Path, 'Future[ParseResult]']] = deque(
+                (path, submit(path)) for path in islice(todo, window))
+            while queue:
+                path, future = queue.popleft()
+                result = _collect(path, future)
+                for path in islice(todo, 1):
+                    queue.append((path, submit(path)))
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                yield result
+        else:
+            pending: Dict['Future[ParseResult]', Path] = {
+                submit(path): path for path in islice(todo, window)}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = _collect(pending.pop(future), future)
+                    for path in islice(todo, 1):
+                        pending[submit(path)] = path
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+                    yield result
@@ -0,0 +1,102 @@
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+from typing import Any, Optional, Union
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+_SUFFIX = '.pickle'
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'eagletools')
+
+
+class ParseCache:
+    """Directory of pickled parse results keyed by content hash
+
+    Entries are evicted least-recently-used first (by mtime, which is
+    refreshed on every hit) once the directory grows past max_size bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int=DEFAULT_MAX_SIZE) \
+            -> None:
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(data: Union[bytes, bytearray, memoryview, mmap.mmap],
+                 version: str) -> str:
+        digest = hashlib.sha256(data)
+        digest.update(b'\0' + version.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or stale entry; drop it and reparse
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,20 +1,26 @@
 import click
+import io
 import os
-import re
-from tabulate import tabulate
-from typing import TextIO, Tuple
-from xml.etree.ElementTree import Element, ElementTree, SubElement
+import sys
+from typing import Any, BinaryIO, Dict, FrozenSet, Iterator, List, Optional, Sequence, Set, TYPE_CHECKING, TextIO, Tuple, Union, cast
 
-from hwpy.value import Value
+# Only what option declarations need is imported up front; commands import
+# the parser, XML backends, hwpy and so on when they run, so --help and
+# commands forwarded by the client don't pay for them.
+from .client import SOCKET_ENV_VAR, default_socket_path
+from .natsort import Key as NaturalKey, natural_key
+from .output import FORMATS
+from .timing import phase, timed
 
-from .parser import Library, Part, Schematic, load_file, parse_file, _text_at
+if TYPE_CHECKING:
+    import mmap
+    from .parser import Board, Library, Schematic
+    from .server import ModelCache
+    from .values import ValueNormalizer
 
 
-def _part_sort_key(value: Tuple[str, Part]) -> Tuple[str, int]:
-    match = re.fullmatch(r'([A-Z]+)([0-9]+)', value[0])
-    if match:
-        return match.group(1), int(match.group(2))
-    return value[0], 0
+def _item_sort_key(item: Tuple[str, Any]) -> NaturalKey:
+    return natural_key(item[0])
 
 
 def _format_dev(dev: str, var: str=None, tech: str=None) -> str:
@@ -43,104 +49,560 @@ def _summary(desc: str) -> str:
     return ''
 
 
+# Model sections each command prints (see parser.SECTIONS)
+_LIBRARY_SECTIONS = frozenset(['packages', 'symbols', 'technologies'])
+_PART_SECTIONS = frozenset(['parts', 'technologies'])
+
+
+def _parse(source: BinaryIO, streaming: bool, include: FrozenSet[str]) \
+        -> Union['Board', 'Library', 'Schematic']:
+    from .parser import parse_file
+
+    options = click.get_current_context().find_root().obj
+
+    def load() -> Union['Board', 'Library', 'Schematic']:
+        return parse_file(source, streaming=streaming,
+                          cache=options.get('cache'),
+                          jobs=options['jobs'] or 1,
+                          include=include)
+
+    # Under `serve`, models stay in memory until the file changes
+    models: Optional['ModelCache'] = options.get('models')
+    if models is None:
+        return load()
+    from .server import MODEL_SIZE_FACTOR
+
+    def load_released() -> Union['Board', 'Library', 'Schematic']:
+        # Fully built, so its size is known up front and doesn't grow
+        model = load()
+        model.release()
+        return model
+
+    st = os.fstat(source.fileno())
+    key = (os.path.realpath(source.name), st.st_mtime_ns, st.st_size,
+           include)
+    return models.get(key, st.st_size * MODEL_SIZE_FACTOR, load_released)
+
+
+def _record_timings(ctx: click.Context, text: bool,
+                    json_out: Optional[TextIO]) -> None:
+    from .timing import Timings
+
+    recorder = Timings()
+    recorder.start()
+
+    def report() -> None:
+        recorder.stop()
+        values = ctx.obj.get('values')
+        if values is not None:
+            recorder.extra['values'] = values.stats()
+        if text:
+            click.echo(recorder.format(), err=True)
+        if json_out is not None:
+            import json
+            json.dump(recorder.as_dict(), json_out, indent=2)
+            json_out.write('\n')
+    ctx.call_on_close(report)
+
+
+_TOP_ALLOCATIONS = 30
+
+
+def _record_profile(ctx: click.Context, path: str, memory: bool) -> None:
+    # Only this process is profiled; work in -j worker processes shows up
+    # as time spent waiting on them
+    import cProfile
+    import tracemalloc
+
+    if memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def report() -> None:
+        profiler.disable()
+        profiler.dump_stats(path)
+        if not memory:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(path + '.memory.txt', 'w') as f:
+            f.write('current {:.1f} MiB, peak {:.1f} MiB\n'.format(
+                current / 2 ** 20, peak / 2 ** 20))
+            f.write('top {} allocation sites still held:\n'.format(
+                _TOP_ALLOCATIONS))
+            for stat in snapshot.statistics('lineno')[:_TOP_ALLOCATIONS]:
+                f.write('{}\n'.format(stat))
+    ctx.call_on_close(report)
+
+
 @click.group()
-def cli() -> None:
-    pass
+@click.option('--cache-dir', type=click.Path(file_okay=False),
+              envvar='EAGLETOOLS_CACHE_DIR',
+              help="Parse cache directory (default ~/.cache/eagletools).")
+@click.option('--no-cache', is_flag=True,
+              help="Don't read or write the parse cache.")
+@click.option('--jobs', '-j', type=click.IntRange(min=1),
+              help="Worker processes for parsing: embedded libraries (default 1), or files for bom (default one per CPU).")
+@click.option('--timings', is_flag=True,
+              help="Print per-phase times and counts to stderr.")
+@click.option('--timings-json', type=click.File('w'), metavar='PATH',
+              help="Write per-phase times and counts to PATH as JSON.")
+@click.option('--profile', type=click.Path(dir_okay=False), metavar='PATH',
+              help="Write cProfile stats for the command to PATH.")
+@click.option('--profile-memory', is_flag=True,
+              help="With --profile, also write the top allocation sites "
+                   "to PATH.memory.txt.")
+@click.pass_context
+def cli(ctx: click.Context, cache_dir: Optional[str], no_cache: bool,
+        jobs: Optional[int], timings: bool, timings_json: Optional[TextIO],
+        profile: Optional[str], profile_memory: bool) -> None:
+    ctx.ensure_object(dict)
+    ctx.obj['jobs'] = jobs
+    if profile_memory and not profile:
+        raise click.UsageError("--profile-memory requires --profile")
+    if timings or timings_json:
+        _record_timings(ctx, timings, timings_json)
+    if profile:
+        _record_profile(ctx, profile, profile_memory)
+    if not no_cache:
+        from .cache import ParseCache, default_cache_dir
+        ctx.obj['cache'] = ParseCache(cache_dir or default_cache_dir())
+
+
+_VALUES_FILE = 'values.json'
+
+_XML_DECLARATION = b'<?xml version="1.0" encoding="utf-8"?>'
+_LBR_DOCTYPE = b'<!DOCTYPE eagle SYSTEM "eagle.dtd">\n'
+_LBR_FOOTER = b'</library>\n</drawing>\n</eagle>\n'
+
+
+def _map_input(in_f: BinaryIO) -> Union[bytes, 'mmap.mmap']:
+    # Map regular files so library bodies are copied straight from the page
+    # cache; pipes and other unmappable inputs are read into memory
+    import mmap
+    try:
+        return mmap.mmap(in_f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return in_f.read()
+
+
+def _new_file_mode() -> int:
+    # mkstemp creates files readable only by their owner; outputs should get
+    # the permissions open() would have given them
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _file_digest(path: str) -> Optional[bytes]:
+    import hashlib
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.digest()
+
+
+def _write_if_changed(path: str, pieces: Sequence[Union[bytes, memoryview]],
+                      mode: int) -> bool:
+    """Atomically write pieces to path unless it already holds them
+
+    Identical outputs are left untouched, so their mtimes (and anything
+    downstream keyed on them) don't change.
+    """
+    import hashlib
+    import tempfile
+
+    size = sum(len(piece) for piece in pieces)
+    try:
+        unchanged = os.path.getsize(path) == size
+    except FileNotFoundError:
+        unchanged = False
+    if unchanged:
+        digest = hashlib.sha256()
+        for piece in pieces:
+            digest.update(piece)
+        if _file_digest(path) == digest.digest():
+            return False
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                               prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(pieces)
+            os.fchmod(f.fileno(), mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return True
 
 
 @cli.command()
 @click.option('--output', '-o', type=click.Path(exists=True, file_okay=False),
               default='.', help="Output directory (default current)")
-@click.argument('in_f', type=click.File('r'))
-def extract(output: str, in_f: TextIO) -> None:
+@click.argument('in_f', type=click.File('rb'))
+def extract(output: str, in_f: BinaryIO) -> None:
     """Extract libraries from a board or schematic"""
-    # Load and validate input file
-    type_, et, element = load_file(in_f)
-    if type_ not in ('board', 'schematic'):
+    from concurrent.futures import ThreadPoolExecutor
+    from xml.sax.saxutils import quoteattr
+    from .parser import probe_file
+    from .scan import library_spans, xml_declaration
+
+    data = _map_input(in_f)
+    probed = probe_file(data)
+    if probed.type not in ('board', 'schematic'):
         raise ValueError("This command requires board or schematic files")
-    version = et.getroot().attrib['version']
 
-    # Extract each library
-    for lib_elt in element.iterfind('./libraries/library'):
-        root = Element('eagle', attrib={'version': version})
-        drawing = SubElement(root, 'drawing')
-        library = SubElement(drawing, 'library')
-        library.extend(lib_elt)
+    # Each library's content is copied byte for byte between a generated
+    # header and footer, rather than rebuilt as a tree and reserialized
+    declaration = xml_declaration(data) or _XML_DECLARATION
+    header = b''.join([
+        declaration, b'\n', _LBR_DOCTYPE,
+        '<eagle version={}>\n<drawing>\n<library>'.format(
+            quoteattr(probed.version)).encode('utf-8')])
+    # Libraries of the same name (but different URNs) go to the same file;
+    # as when they were written one after another, the last one wins
+    targets = {os.path.join(output, '{}.lbr'.format(span.name)): span
+               for span in library_spans(data)}
+    mode = _new_file_mode()
+    with memoryview(data) as view, ThreadPoolExecutor() as executor:
+        jobs = [executor.submit(
+                    _write_if_changed, path,
+                    (header, view[span.body_start:span.body_end],
+                     _LBR_FOOTER),
+                    mode)
+                for path, span in targets.items()]
+        for job in jobs:
+            job.result()
 
-        et = ElementTree(root)
-        et.write(os.path.join(output, '{}.lbr'.format(lib_elt.attrib['name'])),
-                 encoding='utf-8')
+
+@cli.command()
+@click.option('--verbose', '-v', is_flag=True,
+              help="Also show grid and settings headers.")
+@click.argument('paths', nargs=-1,
+                type=click.Path(exists=True, dir_okay=False))
+def info(verbose: bool, paths: Tuple[str, ...]) -> None:
+    """Show the type and EAGLE version of files without fully parsing them"""
+    from xml.etree.ElementTree import ParseError
+    from .parser import probe_file
+
+    failed = False
+    for path in paths:
+        try:
+            probed = probe_file(path)
+        except (ParseError, ValueError) as e:
+            click.echo("{}: error: {}".format(path, e), err=True)
+            failed = True
+            continue
+        print("{}: {} (EAGLE {})".format(path, probed.type, probed.version))
+        if verbose:
+            for key, value in sorted(probed.grid.items()):
+                print("  grid.{}={}".format(key, value))
+            for key, value in sorted(probed.settings.items()):
+                print("  setting.{}={}".format(key, value))
+    if failed:
+        raise SystemExit(1)
+
+
+_LIBRARY_FIELDS = ['type', 'name', 'device', 'variant', 'technology',
+                   'package', 'description']
+
+
+def _library_records(parsed: 'Library') \
+        -> Iterator[Dict[str, Optional[str]]]:
+    from .parser import _text_at
+
+    yield {'type': 'library', 'name': parsed.name,
+           'description': parsed.description}
+    for name, pkg in sorted(parsed.packages.items(), key=_item_sort_key):
+        yield {'type': 'package', 'name': name,
+               'description': _text_at(pkg, './description')}
+    for name, sym in sorted(parsed.symbols.items(), key=_item_sort_key):
+        yield {'type': 'symbol', 'name': name,
+               'description': _text_at(sym, './description')}
+    for dev_name, dev in sorted(parsed.devices.items(), key=_item_sort_key):
+        yield {'type': 'device', 'name': dev_name, 'device': dev_name,
+               'description': dev.description}
+        for var_name, var in sorted(dev.variants.items(), key=_item_sort_key):
+            yield {'type': 'variant', 'name': _format_dev(dev_name, var_name),
+                   'device': dev_name, 'variant': var_name,
+                   'package': var.package}
+            for tech_name in sorted(var.technologies.keys(), key=natural_key):
+                yield {'type': 'technology',
+                       'name': _format_dev(dev_name, var_name, tech_name),
+                       'device': dev_name, 'variant': var_name,
+                       'technology': tech_name, 'package': var.package}
 
 
 @cli.command(name='list')
-@click.argument('in_f', type=click.File('r'))
-def cmd_list(in_f: TextIO) -> None:
+@click.option('--format', type=click.Choice(['text'] + list(FORMATS)),
+              default='text', help="Data output format.")
+@click.option('--stream', is_flag=True,
+              help="Parse incrementally to bound memory use.")
+@click.argument('in_f', type=click.File('rb'))
+def cmd_list(format: str, stream: bool, in_f: BinaryIO) -> None:
     """List the contents of a library"""
-    parsed = parse_file(in_f)
+    from .output import RecordWriter
+    from .parser import Library
+
+    parsed = _parse(in_f, stream, _LIBRARY_SECTIONS)
     if not isinstance(parsed, Library):
         raise NotImplementedError("Only libraries are supported at this time")
 
+    with phase('output'):
+        if format == 'text':
+            _print_library(parsed)
+        else:
+            with RecordWriter(sys.stdout, format, _LIBRARY_FIELDS) as writer:
+                for record in _library_records(parsed):
+                    writer.record(record)
+
+
+def _print_library(parsed: 'Library') -> None:
+    from .parser import _text_at
+
     if parsed.name:
         print("Name: {}".format(parsed.name))
     if parsed.description:
         print("Description: {}".format(_summary(parsed.description)))
     print("Packages:")
-    for name, pkg in sorted(parsed.packages.items()):
+    for name, pkg in sorted(parsed.packages.items(), key=_item_sort_key):
         print("  {}".format(name))
         descr = _text_at(pkg, './description')
         if descr:
             print("    Description: {}".format(_summary(descr)))
     print("Symbols:")
-    for name, sym in sorted(parsed.symbols.items()):
+    for name, sym in sorted(parsed.symbols.items(), key=_item_sort_key):
         print("  {}".format(name))
         descr = _text_at(sym, './description')
         if descr:
             print("    Description: {}".format(_summary(descr)))
     print("Devices:")
-    for dev_name, dev in sorted(parsed.devices.items()):
+    for dev_name, dev in sorted(parsed.devices.items(), key=_item_sort_key):
         print("  {}".format(dev_name))
         if dev.description:
             print("    Description: {}".format(_summary(dev.description)))
         if dev.variants:
             print("    Variants:")
-            for var_name, var in sorted(dev.variants.items()):
+            for var_name, var in sorted(dev.variants.items(), key=_item_sort_key):
                 print("      {} pkg={}".format(_format_dev(dev_name, var_name),
                                                var.package))
                 if var.technologies.keys() != {''}:
-                    for tech_name in sorted(var.technologies.keys()):
+                    for tech_name in sorted(var.technologies.keys(), key=natural_key):
                         formatted = _format_dev(dev_name, var_name, tech_name)
                         print("        {}".format(formatted))
 
 
+def _normalizer() -> 'ValueNormalizer':
+    from .values import ValueNormalizer
+
+    # Created on first use, warmed from and saved back to the cache directory
+    ctx = click.get_current_context().find_root()
+    options = ctx.obj
+    normalizer: Optional['ValueNormalizer'] = options.get('values')
+    if normalizer is not None:
+        return normalizer
+    normalizer = options['values'] = ValueNormalizer()
+    cache = options.get('cache')
+    if cache is not None:
+        path = os.path.join(cache.directory, _VALUES_FILE)
+        normalizer.load(path)
+
+        def save() -> None:
+            if normalizer is not None and normalizer.misses:
+                try:
+                    normalizer.save(path)
+                except OSError:
+                    pass
+        ctx.call_on_close(save)
+    return normalizer
+
+
+def _part_rows(parsed: 'Schematic') \
+        -> Iterator[Tuple[str, str, str, str, str]]:
+    normalize = timed('normalize', _normalizer())
+    for name, part in sorted(parsed.parts.items(), key=_item_sort_key):
+        resolved = parsed.resolved.get(name)
+        attrs = resolved.attributes if resolved else part.attributes
+        yield (name, str(part.library_ref), _format_dev(part.device, part.variant,
+                                                        part.technology),
+               normalize(part.value), attrs.get('MPN', ''))
+
+
 @cli.command()
-@click.option('--format', type=click.Choice(['table', 'machine']),
+@click.option('--format',
+              type=click.Choice(['table', 'tabulate', 'machine'] +
+                                list(FORMATS)),
               default='table', help="Data output format.")
-@click.argument('sch_f', type=click.File('r'))
-def parts(format: str, sch_f: TextIO) -> None:
+@click.option('--stream', is_flag=True,
+              help="Parse incrementally to bound memory use.")
+@click.argument('sch_f', type=click.File('rb'))
+def parts(format: str, stream: bool, sch_f: BinaryIO) -> None:
     """List used parts/libraries in a schematic"""
-    parsed = parse_file(sch_f)
+    from .output import RecordWriter
+    from .parser import Schematic
+    from .table import write_table
+
+    parsed = _parse(sch_f, stream, _PART_SECTIONS)
     if not isinstance(parsed, Schematic):
         raise ValueError("This command requires a schematic file")
 
-    data = []
-    for name, part in sorted(parsed.parts.items(), key=_part_sort_key):
-        tech = parsed.libraries[part.library_ref].devices[part.device].variants[part.variant].technologies[part.technology]
-        attrs = tech.attributes.copy()
-        attrs.update(part.attributes)
-        value = part.value
-        if value:
-            try:
-                value = Value.parse(value).to_str(True)
-            except ValueError:
-                pass
-
-        data.append((name, str(part.library_ref), _format_dev(part.device, part.variant,
-                                                              part.technology),
-                     value or '', attrs.get('MPN', '')))
-    if format == 'table':
-        print(tabulate(data, headers=['Part', 'Library', 'Device', 'Value', 'MPN']))
-    elif format == 'machine':
-        for line in data:
-            print(' '.join(line))
-    else:
-        raise ValueError(format)
+    headers = ['Part', 'Library', 'Device', 'Value', 'MPN']
+    rows = _part_rows(parsed)
+    with phase('output'):
+        if format == 'table':
+            write_table(sys.stdout, headers, rows)
+        elif format == 'tabulate':
+            # Legacy renderer: needs every row in memory before printing any
+            from tabulate import tabulate
+            print(tabulate(list(rows), headers=headers))
+        elif format == 'machine':
+            for line in rows:
+                print(' '.join(line))
+        else:
+            fields = [header.lower() for header in headers]
+            with RecordWriter(sys.stdout, format, fields) as writer:
+                for row in rows:
+                    writer.record(dict(zip(fields, row)))
+
+
+def _schematic_paths(paths: Sequence[str]) -> List[str]:
+    # Directories are searched recursively for .sch files, in sorted order
+    found = []
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            found.extend(os.path.join(root, name) for name in sorted(files)
+                         if name.lower().endswith('.sch'))
+    # Drop repeats so no board is counted twice
+    return list(dict.fromkeys(found))
+
+
+def _board_names(paths: Sequence[str]) -> List[str]:
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(set(names)) != len(names):
+        return list(paths)
+    return names
+
+
+def _line_sort_key(item: Tuple[Tuple[str, str, str], Any]) \
+        -> Tuple[NaturalKey, ...]:
+    return tuple(natural_key(field) for field in item[0])
+
+
+@cli.command()
+@click.option('--format', type=click.Choice(['table'] + list(FORMATS)),
+              default='table', help="Data output format.")
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+def bom(format: str, paths: Tuple[str, ...]) -> None:
+    """Combined bill of materials for schematics (or directories of them)"""
+    from .batch import parse_files
+    from .output import RecordWriter
+    from .parser import Schematic
+    from .table import write_table
+
+    options = click.get_current_context().find_root().obj
+    files = _schematic_paths(paths)
+    column = {path: i for i, path in enumerate(files)}
+
+    # (device, value, MPN) -> (quantity per board, part names)
+    lines: Dict[Tuple[str, str, str], Tuple[List[int], Set[str]]] = {}
+    parsed_boards: Set[int] = set()
+    failed = False
+    normalize = timed('normalize', _normalizer())
+    # Includes waiting on the worker processes
+    with phase('aggregate'):
+        for result in parse_files(files, jobs=options['jobs'],
+                                  cache=options.get('cache'),
+                                  include=_PART_SECTIONS):
+            parsed = result.model
+            if result.error is not None or not isinstance(parsed, Schematic):
+                error = result.error or "not a schematic"
+                click.echo("{}: error: {}".format(result.path, error), err=True)
+                failed = True
+                continue
+            board = column[cast(str, result.path)]
+            parsed_boards.add(board)
+            for name, part in parsed.parts.items():
+                resolved = parsed.resolved.get(name)
+                if resolved is None:
+                    attrs = part.attributes
+                elif resolved.variant.package is None:
+                    # Frames, supply symbols and other parts with nothing to place
+                    continue
+                else:
+                    attrs = resolved.attributes
+                key = (_format_dev(part.device, part.variant, part.technology),
+                       normalize(part.value), attrs.get('MPN', ''))
+                line = lines.get(key)
+                if line is None:
+                    line = lines[key] = ([0] * len(files), set())
+                line[0][board] += 1
+                line[1].add(name)
+
+    # Files that failed to parse get no column
+    kept = sorted(parsed_boards)
+    boards = _board_names([files[i] for i in kept])
+    headers = ['Device', 'Value', 'MPN'] + boards + ['Total', 'Parts']
+    rows = ([device, value, mpn] + [str(quantities[i]) for i in kept] +
+            [str(sum(quantities)),
+             ' '.join(sorted(names, key=natural_key))]
+            for (device, value, mpn), (quantities, names)
+            in sorted(lines.items(), key=_line_sort_key))
+    with phase('output'):
+        if format == 'table':
+            write_table(sys.stdout, headers, rows)
+        else:
+            # Board names are arbitrary, so they're kept apart from the
+            # fixed fields: nested for JSON, prefixed columns for CSV
+            if format == 'csv':
+                fields = (['device', 'value', 'mpn'] +
+                          ['qty:' + board for board in boards] +
+                          ['total', 'parts'])
+            else:
+                fields = ['device', 'value', 'mpn', 'boards', 'total',
+                          'parts']
+            with RecordWriter(sys.stdout, format, fields) as writer:
+                for row in rows:
+                    quantities = [int(qty) for qty in row[3:-2]]
+                    record: Dict[str, Any] = {
+                        'device': row[0], 'value': row[1], 'mpn': row[2],
+                        'total': int(row[-2]), 'parts': row[-1]}
+                    if format == 'csv':
+                        record.update(zip(fields[3:-2], quantities))
+                    else:
+                        record['boards'] = dict(zip(boards, quantities))
+                    writer.record(record)
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False),
+              envvar=SOCKET_ENV_VAR,
+              help="Socket to listen on (default in $XDG_RUNTIME_DIR).")
+@click.option('--max-memory', type=click.IntRange(min=1),
+              default=1024,
+              help="Approximate memory for parsed models, in MB.")
+def serve(socket_path: Optional[str], max_memory: int) -> None:
+    """Keep parsed files in memory and answer list/parts/extract commands"""
+    from .server import serve as run_server
+
+    path = socket_path or default_socket_path()
+    click.echo("Listening on {}".format(path), err=True)
+    try:
+        run_server(path, max_memory * 1024 * 1024)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
@@ -0,0 +1,86 @@
+"""Command-line entry point that forwards to a running server
+
+Only the standard library is imported until we know no server is running,
+so forwarded commands skip loading click, the XML backends and hwpy as
+well as parsing. Everything else falls through to cli.cli.
+"""
+import os
+import sys
+from typing import List, Optional
+
+SOCKET_ENV_VAR = 'EAGLETOOLS_SOCKET'
+
+# Commands the server answers; others always run locally
+FORWARDED = frozenset(['extract', 'list', 'parts'])
+
+# Global options that take a separate value
+_VALUE_OPTIONS = frozenset(['--cache-dir', '--jobs', '-j'])
+
+# Global options that must see this process run the command
+_LOCAL_OPTIONS = frozenset(['--profile', '--profile-memory'])
+
+
+def default_socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV_VAR)
+    if path:
+        return path
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'eagletools.sock')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'eagletools', 'server.sock')
+
+
+def _forwardable(argv: List[str]) -> bool:
+    args = iter(argv)
+    for arg in args:
+        if arg in _LOCAL_OPTIONS or arg.startswith('--profile='):
+            return False
+        if arg in _VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith('-'):
+            # Standard input can't be passed to the server
+            return arg in FORWARDED and '-' not in argv
+    return False
+
+
+def forward(argv: List[str], path: Optional[str]=None) -> Optional[int]:
+    """Run a command on the server, returning its exit status
+
+    Returns None if no server is reachable, or it failed to answer, so the
+    caller can run the command itself.
+    """
+    import json
+    import socket
+
+    request = json.dumps({'argv': argv, 'cwd': os.getcwd()})
+    try:
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(path or default_socket_path())
+            sock.sendall(request.encode('utf-8') + b'\n')
+            chunks = []
+            while True:
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        response = json.loads(b''.join(chunks).decode('utf-8'))
+        status = int(response['status'])
+        stdout = str(response['stdout'])
+        stderr = str(response['stderr'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return status
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if _forwardable(argv):
+        status = forward(argv)
+        if status is not None:
+            sys.stdout.flush()
+            sys.exit(status)
+    from .cli import cli
+    cli()
@@ -0,0 +1,30 @@
+"""Natural sort keys for names like reference designators
+
+natural_key() orders embedded numbers by value, so R2 < R10, U10A follows
+U10 and R1.2 sorts between R1 and R2. Keys are cached because the same
+names are sorted repeatedly (per board, per BOM line, per output format).
+"""
+import re
+from functools import lru_cache
+from typing import List, Tuple, Union, cast
+
+_DIGITS = re.compile(r'(\d+)')
+# The common shape, handled without a general split
+_SIMPLE = re.compile(r'(\D*)(\d+)')
+
+Key = Tuple[Union[str, int], ...]
+
+
+@lru_cache(maxsize=1 << 17)
+def natural_key(name: str) -> Key:
+    # re.split with a capturing group alternates text and digit runs,
+    # always starting with (possibly empty) text, so tokens at the same
+    # position always have the same type and compare cleanly. Names that
+    # differ only in leading zeros (R01, R1) get equal keys and keep their
+    # relative order, as sorted() is stable.
+    simple = _SIMPLE.fullmatch(name)
+    if simple is not None:
+        return simple.group(1), int(simple.group(2)), ''
+    tokens: List[Union[str, int]] = list(_DIGITS.split(name))
+    tokens[1::2] = map(int, cast(List[str], tokens[1::2]))
+    return tuple(tokens)
@@ -0,0 +1,78 @@
+"""Machine-readable record output
+
+RecordWriter writes a stream of flat records as a JSON array, NDJSON
+(one object per line) or CSV. Records are serialized as they arrive and
+written out in blocks, so output can be consumed incrementally without
+the whole result being held in memory.
+"""
+import csv
+import json
+from typing import Any, List, Mapping, Optional, Sequence, TextIO, Type
+from types import TracebackType
+
+FORMATS = ('json', 'ndjson', 'csv')
+
+# Characters buffered before writing to the underlying stream
+BUFFER_SIZE = 64 * 1024
+
+
+class RecordWriter:
+    def __init__(self, out: TextIO, format: str,
+                 fields: Sequence[str]) -> None:
+        if format not in FORMATS:
+            raise ValueError('Unknown output format {!r}'.format(format))
+        self._out = out
+        self._format = format
+        self._fields = fields
+        self._chunks: List[str] = []
+        self._size = 0
+        self._count = 0
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+        self._csv: Any = None
+        if format == 'csv':
+            # The csv module writes lines through our write() method
+            self._csv = csv.writer(self, lineterminator='\n')
+            self._csv.writerow(fields)
+
+    def write(self, text: str) -> None:
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        self._out.write(''.join(self._chunks))
+        self._out.flush()
+        self._chunks = []
+        self._size = 0
+
+    def record(self, record: Mapping[str, Any]) -> None:
+        """Write one record; fields it lacks are written as null/empty"""
+        if self._format == 'csv':
+            self._csv.writerow([record.get(field) for field in self._fields])
+            return
+        text = self._encode({field: record.get(field)
+                             for field in self._fields})
+        if self._format == 'ndjson':
+            self.write(text + '\n')
+        elif self._count:
+            self.write(',\n' + text)
+        else:
+            self.write('[\n' + text)
+        self._count += 1
+
+    def close(self) -> None:
+        if self._format == 'json':
+            self.write('\n]\n' if self._count else '[]\n')
+        self.flush()
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.flush()
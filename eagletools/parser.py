@@ -1,13 +1,70 @@
-from typing import Callable, Dict, NamedTuple, Optional, TYPE_CHECKING, TextIO, Tuple, TypeVar, Union
+import io
+import mmap
+import os
+import sys
+from array import array
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from itertools import repeat
+from typing import Any, BinaryIO, Callable, Dict, FrozenSet, Generic, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, TYPE_CHECKING, TextIO, Tuple, TypeVar, Union, cast
 from xml.etree.ElementTree import ElementTree, Element
 
+from . import timing, xmlbackend
+from .scan import LibrarySpan, library_spans
+
 if TYPE_CHECKING:
-    from xml.etree.ElementTree import parse as parse_xml_et
-else:
-    from defusedxml.ElementTree import parse as parse_xml_et
+    from .cache import ParseCache
 
 
 T = TypeVar('T')
+R = TypeVar('R', bound=tuple)
+
+# Bump whenever the parsed model changes shape, to invalidate cached results
+PARSER_VERSION = '5'
+
+_Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# Inputs accepted by the load/parse functions: a path, an in-memory or
+# memory-mapped buffer, or a file object (binary preferred, text accepted)
+Source = Union[str, 'os.PathLike[str]', _Buffer, BinaryIO, TextIO]
+
+# Sections parse_file() can be asked for; any not requested are skipped and
+# left empty in the model. Descriptions, part/element fields and variant
+# packages are always kept.
+SECTIONS = frozenset(['libraries', 'packages', 'symbols', 'devices', 'gates',
+                      'technologies', 'parts', 'elements', 'signals',
+                      'plain'])
+
+# Sections that only exist inside another
+_SECTION_PARENTS = {
+    'packages': 'libraries',
+    'symbols': 'libraries',
+    'devices': 'libraries',
+    'gates': 'devices',
+    'technologies': 'devices',
+}
+
+# Device.from_et can be used as is when it needs to skip neither of these
+_DEVICE_SECTIONS = frozenset(['gates', 'technologies'])
+
+
+def _sections(include: Optional[Iterable[str]]) -> FrozenSet[str]:
+    if include is None:
+        return SECTIONS
+    sections = set(include)
+    unknown = sections - SECTIONS
+    if unknown:
+        raise ValueError('Unknown sections: {}'.format(
+            ', '.join(sorted(unknown))))
+    # Asking for a nested section implies the ones containing it
+    for name in list(sections):
+        parent = _SECTION_PARENTS.get(name)
+        while parent is not None:
+            sections.add(parent)
+            parent = _SECTION_PARENTS.get(parent)
+    return frozenset(sections)
 
 
 class LibraryRef(NamedTuple):
@@ -28,18 +85,189 @@ def _parse_bool(value: str) -> bool:
     raise ValueError(value)
 
 
-def _parse_library_map(element: Element, query: str) \
+def _parse_library_map(element: Element,
+                       include: FrozenSet[str]=SECTIONS) \
         -> Dict[LibraryRef, 'Library']:
     result = {}
-    for e in element.iterfind(query):
-        lib = Library.from_et(e)
-        result[lib.ref] = lib
+    for e in element:
+        if e.tag == 'library':
+            lib = Library.from_et(e, include)
+            result[lib.ref] = lib
     return result
 
 
-def _parse_map(element: Element, query: str, parser: Callable[[Element], T]) \
+def _parse_map(element: Element, tag: str, parser: Callable[[Element], T]) \
         -> Dict[str, T]:
-    return {e.attrib['name']: parser(e) for e in element.iterfind(query)}
+    return {e.attrib['name']: parser(e) for e in element if e.tag == tag}
+
+
+class _Attributes(Mapping[str, str]):
+    """Read-only attribute map, shared by every object with the same set"""
+    __slots__ = ('_items',)
+
+    def __init__(self, items: Dict[str, str]) -> None:
+        self._items = items
+
+    def __getitem__(self, key: str) -> str:
+        return self._items[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Loading goes through the same cache, so unpickled models share
+        # attribute sets too
+        return _attributes, (tuple(self._items.items()),)
+
+    def __repr__(self) -> str:
+        return '_Attributes({!r})'.format(self._items)
+
+
+_EMPTY_ATTRIBUTES = _Attributes({})
+
+
+@lru_cache(maxsize=4096)
+def _shared_attributes(items: Tuple[Tuple[str, str], ...]) \
+        -> Mapping[str, str]:
+    return _Attributes({sys.intern(k): v for k, v in items})
+
+
+def _attributes(items: Tuple[Tuple[str, str], ...]) -> Mapping[str, str]:
+    # Identical attribute sets (very common across technologies) share one
+    # read-only mapping instead of each object carrying its own copy. The
+    # mapping being read-only makes that safe: no object can change
+    # another's attributes.
+    if not items:
+        return _EMPTY_ATTRIBUTES
+    return _shared_attributes(items)
+
+
+def _parse_attributes(element: Element) -> Mapping[str, str]:
+    return _attributes(tuple((e.attrib['name'], e.attrib['value'])
+                             for e in element if e.tag == 'attribute'))
+
+
+def _identity(element: Element) -> Element:
+    return element
+
+
+# (tag, parser, keys in order, built values, XML of the unbuilt children)
+_LazyMapState = Tuple[str, Callable[[Element], T], List[str], Dict[str, T],
+                      Dict[str, bytes]]
+
+
+class _LazyMap(Mapping[str, T]):
+    """Read-only mapping that parses children of an element on first access
+
+    The name -> child position index is built on first use, and each value
+    is constructed from its element the first time it is looked up. The
+    container element is dropped once every value is built. release()
+    drops it early, keeping each unbuilt child as serialized XML to be
+    parsed on lookup instead, so a long-lived model holds no element tree;
+    pickling stores the same form. Maps of elements (parser _identity)
+    keep every child as XML once released.
+    """
+
+    def __init__(self, container: Element, tag: str,
+                 parser: Callable[[Element], T]) -> None:
+        self._container: Optional[Element] = container
+        self._tag = tag
+        self._parser = parser
+        self._index: Optional[Dict[str, int]] = None
+        self._values: Dict[str, T] = {}
+        self._pending: Dict[str, bytes] = {}
+
+    def _get_index(self) -> Dict[str, int]:
+        if self._index is None:
+            assert self._container is not None
+            tag = self._tag
+            self._index = {e.attrib['name']: i
+                           for i, e in enumerate(self._container)
+                           if e.tag == tag}
+        return self._index
+
+    def __getitem__(self, key: str) -> T:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        index = self._get_index()
+        position = index[key]
+        container = self._container
+        if container is None:
+            value = self._parser(xmlbackend.fromstring(self._pending[key]))
+            if self._parser is _identity:
+                # Not cached, or the map would hold elements again
+                return value
+            del self._pending[key]
+        else:
+            value = self._parser(container[position])
+        self._values[key] = value
+        if container is not None and self._parser is not _identity \
+                and len(self._values) == len(index):
+            self._container = None
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._get_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._get_index())
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+    def load_all(self) -> None:
+        for key in self._get_index():
+            self[key]
+
+    def _unbuilt_xml(self) -> Dict[str, bytes]:
+        container = self._container
+        if container is None:
+            return self._pending
+        built = self._values if self._parser is not _identity else {}
+        return {key: xmlbackend.tostring(container[i])
+                for key, i in self._get_index().items() if key not in built}
+
+    def release(self) -> None:
+        """Drop the container, keeping unbuilt children as XML"""
+        if self._container is None:
+            return
+        self._pending = self._unbuilt_xml()
+        if self._parser is _identity:
+            self._values = {}
+        self._container = None
+
+    @classmethod
+    def released(cls, tag: str, parser: Callable[[Element], T],
+                 values: Dict[str, T], pending: Dict[str, bytes]) \
+            -> '_LazyMap[T]':
+        """Make a map already in released form, from children collected
+        elsewhere: those built in values, the rest as XML in pending"""
+        lazy_map: _LazyMap[T] = cls.__new__(cls)
+        lazy_map.__setstate__((tag, parser, list(values) + list(pending),
+                               values, pending))
+        return lazy_map
+
+    def __getstate__(self) -> '_LazyMapState[T]':
+        values = self._values if self._parser is not _identity else {}
+        return (self._tag, self._parser, list(self._get_index()), values,
+                self._unbuilt_xml())
+
+    def __setstate__(self, state: '_LazyMapState[T]') -> None:
+        self._tag, self._parser, keys, values, self._pending = state
+        self._container = None
+        self._index = {key: i for i, key in enumerate(keys)}
+        self._values = values
+
+    def __repr__(self) -> str:
+        return '<_LazyMap {!r} of {} entries>'.format(self._tag, len(self))
 
 
 def _text_at(element: Element, query: str, none_ok: bool=True) \
@@ -52,44 +280,57 @@ def _text_at(element: Element, query: str, none_ok: bool=True) \
     return found.text
 
 
-class Board:
-    @classmethod
-    def from_et(cls, element: Element) -> 'Board':
-        raise NotImplementedError()
-
-
 class Technology:
-    def __init__(self, name: str, attributes: Dict[str, str]) -> None:
+    __slots__ = ('name', 'attributes')
+
+    def __init__(self, name: str, attributes: Mapping[str, str]) -> None:
         self.name = name
         self.attributes = attributes
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return Technology, (self.name, self.attributes)
+
     @classmethod
     def from_et(cls, element: Element) -> 'Technology':
-        name = element.attrib['name']
-        attributes = _parse_map(element, './attribute',
-                                lambda e: e.attrib['value'])
+        name = sys.intern(element.attrib['name'])
+        attributes = _parse_attributes(element)
         return cls(name, attributes)
 
 
 class Variant:
+    __slots__ = ('name', 'package', 'technologies')
+
     def __init__(self, name: str, package: Optional[str],
                  technologies: Dict[str, Technology]) -> None:
         self.name = name
         self.package = package
         self.technologies = technologies
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return Variant, (self.name, self.package, self.technologies)
+
     @classmethod
-    def from_et(cls, element: Element) -> 'Variant':
-        name = element.attrib['name']
+    def from_et(cls, element: Element, include: FrozenSet[str]=SECTIONS) \
+            -> 'Variant':
+        name = sys.intern(element.attrib['name'])
         package = element.attrib.get('package')
-        techs = _parse_map(element, './technologies/technology',
-                           Technology.from_et)
+        if package is not None:
+            package = sys.intern(package)
+        techs: Dict[str, Technology] = {}
+        if 'technologies' not in include:
+            return cls(name, package, techs)
+        for child in element:
+            if child.tag == 'technologies':
+                techs = _parse_map(child, 'technology', Technology.from_et)
         return cls(name, package, techs)
 
 
 class Device:
+    __slots__ = ('name', 'prefix', 'uservalue', 'description', 'gates',
+                 'variants')
+
     def __init__(self, name: str, prefix: str, uservalue: bool,
-                 description: Optional[str], gates: Dict[str, Element],
+                 description: Optional[str], gates: Mapping[str, Element],
                  variants: Dict[str, Variant]) -> None:
         self.name = name
         self.prefix = prefix
@@ -98,26 +339,51 @@ class Device:
         self.gates = gates
         self.variants = variants
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return Device, (self.name, self.prefix, self.uservalue,
+                        self.description, self.gates, self.variants)
+
     @classmethod
-    def from_et(cls, element: Element) -> 'Device':
-        name = element.attrib['name']
-        prefix = element.attrib.get('prefix', '')
+    def from_et(cls, element: Element, include: FrozenSet[str]=SECTIONS) \
+            -> 'Device':
+        name = sys.intern(element.attrib['name'])
+        prefix = sys.intern(element.attrib.get('prefix', ''))
         uservalue = _parse_bool(element.attrib.get('uservalue', 'no'))
-        description = _text_at(element, './description')
-        gates = _parse_map(element, './gates/gate', lambda e: e)
+        description = None
+        gates: Mapping[str, Element] = {}
         variants = {}
-        for var_elt in element.iterfind('./devices/device'):
-            var_name = var_elt.attrib.get('name', '')
-            variants[var_name] = Variant.from_et(var_elt)
+        for child in element:
+            tag = child.tag
+            if tag == 'description':
+                description = child.text
+            elif tag == 'gates' and 'gates' in include:
+                gates = _LazyMap(child, 'gate', _identity)
+            elif tag == 'devices':
+                for var_elt in child:
+                    if var_elt.tag == 'device':
+                        var_name = sys.intern(var_elt.attrib.get('name', ''))
+                        variants[var_name] = Variant.from_et(var_elt,
+                                                             include)
         return cls(name, prefix, uservalue, description, gates, variants)
 
+    def release(self) -> None:
+        """Keep gates as XML rather than elements (see Library.release())"""
+        if isinstance(self.gates, _LazyMap):
+            self.gates.release()
+
+
+def _device_parser(include: FrozenSet[str]) -> Callable[[Element], Device]:
+    if include >= _DEVICE_SECTIONS:
+        return Device.from_et
+    return partial(Device.from_et, include=include)
+
 
 class Library:
     def __init__(self, name: Optional[str], urn: str,
                  description: Optional[str],
-                 packages: Dict[str, Element],
-                 symbols: Dict[str, Element],
-                 devices: Dict[str, Device]) -> None:
+                 packages: Mapping[str, Element],
+                 symbols: Mapping[str, Element],
+                 devices: Mapping[str, Device]) -> None:
         self.name = name
         self.urn = urn
         self.description = description
@@ -126,17 +392,43 @@ class Library:
         self.devices = devices
 
     @classmethod
-    def from_et(cls, element: Element) -> 'Library':
+    def from_et(cls, element: Element, include: FrozenSet[str]=SECTIONS) \
+            -> 'Library':
         # Per DTD, name is only present within board/schematic files
         name = element.attrib.get('name')
         urn = element.attrib.get('urn', '')
-        description = _text_at(element, './description')
-        packages = _parse_map(element, './packages/package', lambda e: e)
-        symbols = _parse_map(element, './symbols/symbol', lambda e: e)
-        devices = _parse_map(element, './devicesets/deviceset',
-                             Device.from_et)
+        # Packages, symbols and devices are only indexed and built on demand
+        description = None
+        packages: Mapping[str, Element] = {}
+        symbols: Mapping[str, Element] = {}
+        devices: Mapping[str, Device] = {}
+        parse_device = _device_parser(include)
+        for child in element:
+            tag = child.tag
+            if tag == 'description':
+                description = child.text
+            elif tag == 'packages' and 'packages' in include:
+                packages = _LazyMap(child, 'package', _identity)
+            elif tag == 'symbols' and 'symbols' in include:
+                symbols = _LazyMap(child, 'symbol', _identity)
+            elif tag == 'devicesets' and 'devices' in include:
+                devices = _LazyMap(child, 'deviceset', parse_device)
         return cls(name, urn, description, packages, symbols, devices)
 
+    def release(self) -> None:
+        """Build every device and drop the element trees still held
+
+        Packages, symbols and gates are kept as XML and parsed again when
+        looked up.
+        """
+        if isinstance(self.devices, _LazyMap):
+            self.devices.load_all()
+        for device in self.devices.values():
+            device.release()
+        for elements in (self.packages, self.symbols):
+            if isinstance(elements, _LazyMap):
+                elements.release()
+
     @property
     def ref(self) -> LibraryRef:
         if self.name is None:
@@ -145,9 +437,12 @@ class Library:
 
 
 class Part:
+    __slots__ = ('name', 'library', 'library_urn', 'device', 'variant',
+                 'technology', 'value', 'attributes')
+
     def __init__(self, name: str, library: str, library_urn: str, device: str,
                  variant: str, technology: str, value: Optional[str],
-                 attributes: Dict[str, str]) -> None:
+                 attributes: Mapping[str, str]) -> None:
         self.name = name
         self.library = library
         self.library_urn = library_urn
@@ -157,17 +452,22 @@ class Part:
         self.value = value
         self.attributes = attributes
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return Part, (self.name, self.library, self.library_urn, self.device,
+                      self.variant, self.technology, self.value,
+                      self.attributes)
+
     @classmethod
     def from_et(cls, element: Element) -> 'Part':
-        name = element.attrib['name']
-        library = element.attrib['library']
-        library_urn = element.attrib.get('library_urn', '')
-        device = element.attrib['deviceset']
-        variant = element.attrib['device']
-        technology = element.attrib.get('technology', '')
-        value = element.attrib.get('value')
-        attributes = _parse_map(element, './attribute',
-                                lambda e: e.attrib['value'])
+        attrib = element.attrib
+        name = attrib['name']
+        library = sys.intern(attrib['library'])
+        library_urn = sys.intern(attrib.get('library_urn', ''))
+        device = sys.intern(attrib['deviceset'])
+        variant = sys.intern(attrib['device'])
+        technology = sys.intern(attrib.get('technology', ''))
+        value = attrib.get('value')
+        attributes = _parse_attributes(element)
         return cls(name, library, library_urn, device, variant, technology,
                    value, attributes)
 
@@ -176,6 +476,33 @@ class Part:
         return LibraryRef(self.library, self.library_urn)
 
 
+class Resolution(NamedTuple):
+    device: Device
+    variant: Variant
+    technology: Technology
+    # Part attributes layered over the technology's, without copying either
+    attributes: Mapping[str, str]
+
+
+def _resolve_parts(libraries: Dict[LibraryRef, Library],
+                   parts: Dict[str, Part]) -> Dict[str, Resolution]:
+    resolved = {}
+    for name, part in parts.items():
+        try:
+            device = libraries[part.library_ref].devices[part.device]
+            variant = device.variants[part.variant]
+            tech = variant.technologies[part.technology]
+        except KeyError:
+            # Dangling references are left out rather than failing the parse
+            continue
+        attributes = tech.attributes
+        if part.attributes:
+            attributes = ChainMap(cast(Dict[str, str], part.attributes),
+                                  cast(Dict[str, str], tech.attributes))
+        resolved[name] = Resolution(device, variant, tech, attributes)
+    return resolved
+
+
 class Schematic:
     def __init__(self, description: Optional[str],
                  libraries: Dict[LibraryRef, Library],
@@ -183,37 +510,956 @@ class Schematic:
         self.description = description
         self.libraries = libraries
         self.parts = parts
+        # Part name -> resolved library objects, for parts whose library,
+        # device, variant and technology all exist
+        with timing.phase('resolve'):
+            self.resolved = _resolve_parts(libraries, parts)
+
+    def release(self) -> None:
+        """Release every embedded library (see Library.release())"""
+        for library in self.libraries.values():
+            library.release()
 
     @classmethod
-    def from_et(cls, element: Element) -> 'Schematic':
-        description = _text_at(element, './description')
-        libraries = _parse_library_map(element, './libraries/library')
-        parts = _parse_map(element, './parts/part', Part.from_et)
+    def from_et(cls, element: Element,
+                libraries: Optional[Dict[LibraryRef, Library]]=None,
+                include: FrozenSet[str]=SECTIONS) -> 'Schematic':
+        # Pre-parsed libraries replace the <libraries> section when given
+        description = None
+        parse_libraries = libraries is None and 'libraries' in include
+        if libraries is None:
+            libraries = {}
+        parts: Dict[str, Part] = {}
+        for child in element:
+            tag = child.tag
+            if tag == 'description':
+                description = child.text
+            elif tag == 'libraries' and parse_libraries:
+                libraries = _parse_library_map(child, include)
+            elif tag == 'parts' and 'parts' in include:
+                parts = _parse_map(child, 'part', Part.from_et)
         return cls(description, libraries, parts)
 
 
-def load_file(source: TextIO) -> Tuple[str, ElementTree, Element]:
-    et = parse_xml_et(source)
-    if et.getroot().tag != 'eagle':
+class Wire(NamedTuple):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    width: float
+    layer: int
+    curve: float
+    style: str
+    cap: str
+
+
+class Via(NamedTuple):
+    x: float
+    y: float
+    drill: float
+    diameter: float
+    extent: str
+    shape: str
+
+
+class Hole(NamedTuple):
+    x: float
+    y: float
+    drill: float
+
+
+class Vertex(NamedTuple):
+    x: float
+    y: float
+    curve: float
+
+
+class Polygon(NamedTuple):
+    width: float
+    layer: int
+    spacing: float
+    isolate: float
+    rank: int
+    pour: str
+    thermals: str
+    orphans: str
+    vertices: '_RowView[Vertex]'
+
+
+class Text(NamedTuple):
+    x: float
+    y: float
+    size: float
+    layer: int
+    ratio: int
+    distance: int
+    font: str
+    rot: str
+    align: str
+    text: str
+
+
+class Circle(NamedTuple):
+    x: float
+    y: float
+    radius: float
+    width: float
+    layer: int
+
+
+class Rectangle(NamedTuple):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    layer: int
+    rot: str
+
+
+class Dimension(NamedTuple):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+    x3: float
+    y3: float
+    layer: int
+    width: float
+    extwidth: float
+    extlength: float
+    extoffset: float
+    textsize: float
+    textratio: int
+    precision: int
+    dtype: str
+    unit: str
+    visible: str
+
+
+class _StringColumn:
+    """Column of strings drawn from a small set, such as wire styles
+
+    Each row stores a byte-sized code into a table of the distinct values
+    rather than a reference of its own; the codes widen if a column ever
+    sees more than 256 values.
+    """
+    __slots__ = ('_codes', '_values', '_index')
+
+    def __init__(self) -> None:
+        self._codes = array('B')
+        self._values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = len(self._values)
+            if code == 256:
+                self._codes = array('I', self._codes)
+            self._index[value] = code
+            self._values.append(sys.intern(value))
+        self._codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._values[code] for code in self._codes[index]]
+        return self._values[self._codes[index]]
+
+
+class _RowArray(Generic[R]):
+    """Column-oriented storage for many small geometry primitives
+
+    Each numeric attribute is kept in its own typed array rather than as a
+    float object per primitive, and each string attribute in a
+    _StringColumn; rows are materialized as named tuples only when indexed
+    or iterated. A board keeps one array per primitive type and each
+    signal holds a view of its contiguous range.
+    """
+    __slots__ = ('_columns',)
+
+    # (attribute name, array typecode or 's' for strings, default value)
+    _fields: Tuple[Tuple[str, str, str], ...] = ()
+    _row: Callable[..., R]
+
+    def __init__(self) -> None:
+        self._columns: Tuple[Any, ...] = tuple(
+            _StringColumn() if code == 's' else array(code)
+            for _, code, _ in self._fields)
+
+    def append_et(self, element: Element) -> None:
+        get = element.get
+        for (name, code, default), column in zip(self._fields,
+                                                 self._columns):
+            value = get(name, default)
+            if code == 's':
+                column.append(value)
+            elif code == 'd':
+                column.append(float(value))
+            else:
+                column.append(int(value))
+
+    def column(self, name: str) -> Sequence[Any]:
+        for (field, _, _), column in zip(self._fields, self._columns):
+            if field == name:
+                return cast(Sequence[Any], column)
+        raise KeyError(name)
+
+    def view(self, start: int, stop: int) -> '_RowView[R]':
+        return _RowView(self, start, stop)
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[R]:
+        return map(self._row, *(column[start:stop]
+                                for column in self._columns))
+
+    def __len__(self) -> int:
+        return len(self._columns[0])
+
+    def __getitem__(self, index: int) -> R:
+        return self._row(*(column[index] for column in self._columns))
+
+    def __iter__(self) -> Iterator[R]:
+        return self._iter_range(0, len(self))
+
+
+class _RowView(Generic[R]):
+    __slots__ = ('_rows', '_start', '_stop')
+
+    def __init__(self, rows: _RowArray[R], start: int, stop: int) -> None:
+        self._rows = rows
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: int) -> R:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._rows[self._start + index]
+
+    def __iter__(self) -> Iterator[R]:
+        return self._rows._iter_range(self._start, self._stop)
+
+    # Rows embed views (a polygon's vertices), so views compare by value
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _RowView):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+
+class Wires(_RowArray[Wire]):
+    __slots__ = ()
+    _fields = (('x1', 'd', '0'), ('y1', 'd', '0'), ('x2', 'd', '0'),
+               ('y2', 'd', '0'), ('width', 'd', '0'), ('layer', 'H', '0'),
+               ('curve', 'd', '0'), ('style', 's', 'continuous'),
+               ('cap', 's', 'round'))
+    _row = Wire
+
+    def append_et(self, element: Element) -> None:
+        # Unrolled: wires far outnumber every other primitive on a board
+        get = element.get
+        x1, y1, x2, y2, width, layer, curve, style, cap = self._columns
+        x1.append(float(get('x1', '0')))
+        y1.append(float(get('y1', '0')))
+        x2.append(float(get('x2', '0')))
+        y2.append(float(get('y2', '0')))
+        width.append(float(get('width', '0')))
+        layer.append(int(get('layer', '0')))
+        curve.append(float(get('curve', '0')))
+        style.append(get('style', 'continuous'))
+        cap.append(get('cap', 'round'))
+
+
+class Vias(_RowArray[Via]):
+    __slots__ = ()
+    _fields = (('x', 'd', '0'), ('y', 'd', '0'), ('drill', 'd', '0'),
+               ('diameter', 'd', '0'), ('extent', 's', ''),
+               ('shape', 's', 'round'))
+    _row = Via
+
+
+class Holes(_RowArray[Hole]):
+    __slots__ = ()
+    _fields = (('x', 'd', '0'), ('y', 'd', '0'), ('drill', 'd', '0'))
+    _row = Hole
+
+
+class Vertices(_RowArray[Vertex]):
+    __slots__ = ()
+    _fields = (('x', 'd', '0'), ('y', 'd', '0'), ('curve', 'd', '0'))
+    _row = Vertex
+
+
+class Polygons(_RowArray[Polygon]):
+    # Outlines as drawn; the poured copper isn't stored in the file
+    __slots__ = ('vertices', '_bounds')
+    _fields = (('width', 'd', '0'), ('layer', 'H', '0'),
+               ('spacing', 'd', '0'), ('isolate', 'd', '0'),
+               ('rank', 'H', '0'), ('pour', 's', 'solid'),
+               ('thermals', 's', 'yes'), ('orphans', 's', 'no'))
+    _row = Polygon
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Polygon i's vertices are vertices[_bounds[i]:_bounds[i + 1]]
+        self.vertices = Vertices()
+        self._bounds = array('L', [0])
+
+    def append_et(self, element: Element) -> None:
+        super().append_et(element)
+        for child in element:
+            if child.tag == 'vertex':
+                self.vertices.append_et(child)
+        self._bounds.append(len(self.vertices))
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Polygon]:
+        return map(Polygon,
+                   *(column[start:stop] for column in self._columns),
+                   map(self.vertices.view, self._bounds[start:stop],
+                       self._bounds[start + 1:stop + 1]))
+
+    def __getitem__(self, index: int) -> Polygon:
+        if index < 0:
+            index += len(self)
+        width, layer, spacing, isolate, rank, pour, thermals, orphans = (
+            column[index] for column in self._columns)
+        return Polygon(width, layer, spacing, isolate, rank, pour, thermals,
+                       orphans, self.vertices.view(self._bounds[index],
+                                                   self._bounds[index + 1]))
+
+
+class Texts(_RowArray[Text]):
+    __slots__ = ('_text',)
+    _fields = (('x', 'd', '0'), ('y', 'd', '0'), ('size', 'd', '0'),
+               ('layer', 'H', '0'), ('ratio', 'H', '8'),
+               ('distance', 'H', '50'), ('font', 's', 'proportional'),
+               ('rot', 's', 'R0'), ('align', 's', 'bottom-left'))
+    _row = Text
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._text: List[str] = []
+
+    def append_et(self, element: Element) -> None:
+        super().append_et(element)
+        self._text.append(element.text or '')
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Text]:
+        return map(Text, *(column[start:stop] for column in self._columns),
+                   self._text[start:stop])
+
+    def __getitem__(self, index: int) -> Text:
+        x, y, size, layer, ratio, distance, font, rot, align = (
+            column[index] for column in self._columns)
+        return Text(x, y, size, layer, ratio, distance, font, rot, align,
+                    self._text[index])
+
+
+class Circles(_RowArray[Circle]):
+    __slots__ = ()
+    _fields = (('x', 'd', '0'), ('y', 'd', '0'), ('radius', 'd', '0'),
+               ('width', 'd', '0'), ('layer', 'H', '0'))
+    _row = Circle
+
+
+class Rectangles(_RowArray[Rectangle]):
+    __slots__ = ()
+    _fields = (('x1', 'd', '0'), ('y1', 'd', '0'), ('x2', 'd', '0'),
+               ('y2', 'd', '0'), ('layer', 'H', '0'), ('rot', 's', 'R0'))
+    _row = Rectangle
+
+
+class Dimensions(_RowArray[Dimension]):
+    __slots__ = ()
+    _fields = (('x1', 'd', '0'), ('y1', 'd', '0'), ('x2', 'd', '0'),
+               ('y2', 'd', '0'), ('x3', 'd', '0'), ('y3', 'd', '0'),
+               ('layer', 'H', '0'), ('width', 'd', '0'),
+               ('extwidth', 'd', '0'), ('extlength', 'd', '0'),
+               ('extoffset', 'd', '0'), ('textsize', 'd', '0'),
+               ('textratio', 'H', '8'), ('precision', 'H', '2'),
+               ('dtype', 's', 'parallel'), ('unit', 's', 'mm'),
+               ('visible', 's', 'no'))
+    _row = Dimension
+
+
+class ContactRef(NamedTuple):
+    element: str
+    pad: str
+
+
+class Signal:
+    __slots__ = ('name', 'net_class', 'contacts', 'wires', 'vias',
+                 'polygons')
+
+    def __init__(self, name: str, net_class: str,
+                 contacts: List[ContactRef], wires: _RowView[Wire],
+                 vias: _RowView[Via], polygons: _RowView[Polygon]) -> None:
+        self.name = name
+        self.net_class = net_class
+        self.contacts = contacts
+        self.wires = wires
+        self.vias = vias
+        self.polygons = polygons
+
+    @classmethod
+    def from_et(cls, element: Element, wires: Optional[Wires]=None,
+                vias: Optional[Vias]=None,
+                polygons: Optional[Polygons]=None) -> 'Signal':
+        # Geometry is appended to the given (usually board-wide) arrays
+        if wires is None:
+            wires = Wires()
+        if vias is None:
+            vias = Vias()
+        if polygons is None:
+            polygons = Polygons()
+        name = element.attrib['name']
+        net_class = sys.intern(element.attrib.get('class', '0'))
+        contacts = []
+        wire_start = len(wires)
+        via_start = len(vias)
+        polygon_start = len(polygons)
+        for child in element:
+            tag = child.tag
+            if tag == 'wire':
+                wires.append_et(child)
+            elif tag == 'via':
+                vias.append_et(child)
+            elif tag == 'polygon':
+                polygons.append_et(child)
+            elif tag == 'contactref':
+                contacts.append(ContactRef(
+                    sys.intern(child.attrib['element']),
+                    sys.intern(child.attrib['pad'])))
+        return cls(name, net_class, contacts,
+                   wires.view(wire_start, len(wires)),
+                   vias.view(via_start, len(vias)),
+                   polygons.view(polygon_start, len(polygons)))
+
+
+class BoardElement:
+    __slots__ = ('name', 'library', 'library_urn', 'package', 'value', 'x',
+                 'y', 'rot', 'attributes')
+
+    def __init__(self, name: str, library: str, library_urn: str,
+                 package: str, value: str, x: float, y: float, rot: str,
+                 attributes: Mapping[str, str]) -> None:
+        self.name = name
+        self.library = library
+        self.library_urn = library_urn
+        self.package = package
+        self.value = value
+        self.x = x
+        self.y = y
+        self.rot = rot
+        self.attributes = attributes
+
+    @classmethod
+    def from_et(cls, element: Element) -> 'BoardElement':
+        attrib = element.attrib
+        name = attrib['name']
+        library = sys.intern(attrib['library'])
+        library_urn = sys.intern(attrib.get('library_urn', ''))
+        package = sys.intern(attrib['package'])
+        value = attrib.get('value', '')
+        x = float(attrib['x'])
+        y = float(attrib['y'])
+        rot = sys.intern(attrib.get('rot', 'R0'))
+        attributes = _parse_attributes(element)
+        return cls(name, library, library_urn, package, value, x, y, rot,
+                   attributes)
+
+    @property
+    def library_ref(self) -> LibraryRef:
+        return LibraryRef(self.library, self.library_urn)
+
+
+class Plain:
+    """Drawing on a board outside any signal; frames are not kept"""
+    __slots__ = ('wires', 'holes', 'polygons', 'texts', 'circles',
+                 'rectangles', 'dimensions')
+
+    def __init__(self) -> None:
+        self.wires = Wires()
+        self.holes = Holes()
+        self.polygons = Polygons()
+        self.texts = Texts()
+        self.circles = Circles()
+        self.rectangles = Rectangles()
+        self.dimensions = Dimensions()
+
+    def append_et(self, element: Element) -> None:
+        tag = element.tag
+        if tag == 'wire':
+            self.wires.append_et(element)
+        elif tag == 'hole':
+            self.holes.append_et(element)
+        elif tag == 'polygon':
+            self.polygons.append_et(element)
+        elif tag == 'text':
+            self.texts.append_et(element)
+        elif tag == 'circle':
+            self.circles.append_et(element)
+        elif tag == 'rectangle':
+            self.rectangles.append_et(element)
+        elif tag == 'dimension':
+            self.dimensions.append_et(element)
+
+    @classmethod
+    def from_et(cls, element: Element) -> 'Plain':
+        plain = cls()
+        for child in element:
+            plain.append_et(child)
+        return plain
+
+
+class Board:
+    """A parsed board
+
+    Copper of all signals (wires, vias and polygon outlines) is held in
+    board-wide row arrays that each Signal views a slice of; plain holds
+    the drawing outside signals. Not modeled: frames, the placement of
+    element attribute texts, and the layer, class and design rule setup.
+    """
+    def __init__(self, description: Optional[str],
+                 libraries: Dict[LibraryRef, Library],
+                 elements: Dict[str, BoardElement],
+                 signals: Dict[str, Signal], wires: Wires, vias: Vias,
+                 polygons: Polygons, plain: Plain) -> None:
+        self.description = description
+        self.libraries = libraries
+        self.elements = elements
+        self.signals = signals
+        # Routed copper of all signals; each Signal views a slice of these
+        self.wires = wires
+        self.vias = vias
+        self.polygons = polygons
+        self.plain = plain
+
+    def release(self) -> None:
+        """Release every embedded library (see Library.release())"""
+        for library in self.libraries.values():
+            library.release()
+
+    @classmethod
+    def from_et(cls, element: Element,
+                libraries: Optional[Dict[LibraryRef, Library]]=None,
+                include: FrozenSet[str]=SECTIONS) -> 'Board':
+        # Pre-parsed libraries replace the <libraries> section when given
+        description = None
+        parse_libraries = libraries is None and 'libraries' in include
+        if libraries is None:
+            libraries = {}
+        elements: Dict[str, BoardElement] = {}
+        signals: Dict[str, Signal] = {}
+        wires = Wires()
+        vias = Vias()
+        polygons = Polygons()
+        plain = Plain()
+        for child in element:
+            tag = child.tag
+            if tag == 'description':
+                description = child.text
+            elif tag not in include:
+                continue
+            elif tag == 'plain':
+                plain = Plain.from_et(child)
+            elif tag == 'libraries' and parse_libraries:
+                libraries = _parse_library_map(child, include)
+            elif tag == 'elements':
+                elements = _parse_map(child, 'element', BoardElement.from_et)
+            elif tag == 'signals':
+                for signal_elt in child:
+                    if signal_elt.tag == 'signal':
+                        signal = Signal.from_et(signal_elt, wires, vias,
+                                                polygons)
+                        signals[signal.name] = signal
+        return cls(description, libraries, elements, signals, wires, vias,
+                   polygons, plain)
+
+
+class _BufferReader:
+    # Feeds a buffer to the XML parser a chunk at a time instead of copying
+    # it into a BytesIO up front
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def read(self, size: int=-1) -> bytes:
+        start = self._pos
+        end = len(self._view)
+        if 0 <= size < end - start:
+            end = start + size
+        self._pos = end
+        return self._view[start:end].tobytes()
+
+
+@contextmanager
+def _open_source(source: Source) -> Iterator[Union[BinaryIO, TextIO]]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield f
+    elif isinstance(source, bytes):
+        yield io.BytesIO(source)
+    elif isinstance(source, (bytearray, memoryview, mmap.mmap)):
+        with memoryview(source) as view:
+            yield cast(BinaryIO, _BufferReader(view))
+    else:
+        yield source
+
+
+def _read_source(source: Source) -> _Buffer:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return source
+    data = source.read()
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return data
+
+
+class FileInfo(NamedTuple):
+    type: str
+    version: str
+    settings: Dict[str, str]
+    grid: Dict[str, str]
+
+
+_DRAWING_TYPES = frozenset(['board', 'library', 'schematic'])
+
+
+def probe_file(source: Source, backend: Optional[str]=None) -> FileInfo:
+    with _open_source(source) as f:
+        return _probe(f, backend)
+
+
+def _probe(source: Union[BinaryIO, TextIO], backend: Optional[str]) \
+        -> FileInfo:
+    # Stops at the first board/library/schematic start tag, so only the
+    # drawing headers are ever read and parsed.
+    version = ''
+    settings: Dict[str, str] = {}
+    grid: Dict[str, str] = {}
+    path: List[str] = []
+    for event, elem in xmlbackend.iterparse(source, ('start', 'end'),
+                                            backend):
+        if event == 'end':
+            path.pop()
+            continue
+        path.append(elem.tag)
+        depth = len(path)
+        if depth == 1:
+            if elem.tag != 'eagle':
+                raise ValueError('Not an EAGLE file')
+            version = elem.attrib.get('version', '')
+        elif depth == 3 and path[1] == 'drawing':
+            if elem.tag in _DRAWING_TYPES:
+                return FileInfo(elem.tag, version, settings, grid)
+            if elem.tag == 'grid':
+                grid = dict(elem.attrib)
+        elif depth == 4 and path[1:3] == ['drawing', 'settings']:
+            if elem.tag == 'setting':
+                settings.update(elem.attrib)
+    raise ValueError('Corrupt or unhandled EAGLE file')
+
+
+def load_file(source: Source, backend: Optional[str]=None) \
+        -> Tuple[str, ElementTree, Element]:
+    with _open_source(source) as f:
+        et = xmlbackend.parse(f, backend)
+    root = et.getroot()
+    if root is None or root.tag != 'eagle':
         raise ValueError('Not an EAGLE file')
     board = et.find('./drawing/board')
-    if board:
+    if board is not None:
         return 'board', et, board
     library = et.find('./drawing/library')
-    if library:
+    if library is not None:
         return 'library', et, library
     schematic = et.find('./drawing/schematic')
-    if schematic:
+    if schematic is not None:
         return 'schematic', et, schematic
     raise ValueError('Corrupt or unhandled EAGLE file')
 
 
-def parse_file(source: TextIO) -> Union[Board, Library, Schematic]:
-    type_, et, element = load_file(source)
-    if type_ == 'board':
-        return Board.from_et(element)
-    if type_ == 'library':
-        return Library.from_et(element)
-    if type_ == 'schematic':
-        return Schematic.from_et(element)
+_Path = Tuple[str, ...]
+
+_BOARD_PATH = ('eagle', 'drawing', 'board')
+_LIBRARY_PATH = ('eagle', 'drawing', 'library')
+_SCHEMATIC_PATH = ('eagle', 'drawing', 'schematic')
+
+# Paths yielded by _iter_subtrees while streaming. True means the subtree is
+# kept intact until its end tag; False means it is yielded with its children
+# already discarded.
+_STREAM_PATHS = {
+    _BOARD_PATH: False,
+    _BOARD_PATH + ('description',): True,
+    _BOARD_PATH + ('plain', 'wire'): True,
+    _BOARD_PATH + ('plain', 'hole'): True,
+    _BOARD_PATH + ('plain', 'polygon'): True,
+    _BOARD_PATH + ('plain', 'text'): True,
+    _BOARD_PATH + ('plain', 'circle'): True,
+    _BOARD_PATH + ('plain', 'rectangle'): True,
+    _BOARD_PATH + ('plain', 'dimension'): True,
+    _BOARD_PATH + ('libraries', 'library'): True,
+    _BOARD_PATH + ('elements', 'element'): True,
+    _BOARD_PATH + ('signals', 'signal'): True,
+    _LIBRARY_PATH: False,
+    _LIBRARY_PATH + ('description',): True,
+    _LIBRARY_PATH + ('packages', 'package'): True,
+    _LIBRARY_PATH + ('symbols', 'symbol'): True,
+    _LIBRARY_PATH + ('devicesets', 'deviceset'): True,
+    _SCHEMATIC_PATH: False,
+    _SCHEMATIC_PATH + ('description',): True,
+    _SCHEMATIC_PATH + ('libraries', 'library'): True,
+    _SCHEMATIC_PATH + ('parts', 'part'): True,
+}
+
+
+# Container tags whose section name differs
+_SECTION_TAGS = {'devicesets': 'devices'}
+
+
+def _stream_paths(include: FrozenSet[str]) -> Dict[_Path, bool]:
+    # Sections not asked for are dropped as they end, like anything else
+    # outside a kept subtree; their path component names the section
+    return {path: keep for path, keep in _STREAM_PATHS.items()
+            if len(path) <= 3 or path[3] == 'description'
+            or _SECTION_TAGS.get(path[3], path[3]) in include}
+
+
+def _iter_subtrees(source: Union[BinaryIO, TextIO],
+                   paths: Mapping[_Path, bool], backend: Optional[str]) \
+        -> Iterator[Tuple[_Path, Element]]:
+    path: List[str] = []
+    stack: List[Element] = []
+    keep_depth = 0
+    for event, elem in xmlbackend.iterparse(source, ('start', 'end'),
+                                            backend):
+        if event == 'start':
+            if not stack and elem.tag != 'eagle':
+                raise ValueError('Not an EAGLE file')
+            path.append(elem.tag)
+            stack.append(elem)
+            if not keep_depth and paths.get(tuple(path)):
+                keep_depth = len(path)
+            continue
+
+        depth = len(path)
+        key = tuple(path)
+        path.pop()
+        stack.pop()
+        if keep_depth and depth > keep_depth:
+            continue
+        keep_depth = 0
+        if key in paths:
+            yield key, elem
+        # Everything outside a kept subtree is dropped as soon as it ends, so
+        # only the open path and the subtree being collected stay in memory.
+        if stack:
+            elem.clear()
+            stack[-1].remove(elem)
+
+
+def _parse_streaming(source: Union[BinaryIO, TextIO],
+                     backend: Optional[str],
+                     libraries: Optional[Dict[LibraryRef, Library]],
+                     include: FrozenSet[str]=SECTIONS) \
+        -> Union[Board, Library, Schematic]:
+    description = None
+    parse_libraries = libraries is None and 'libraries' in include
+    if libraries is None:
+        libraries = {}
+    parts: Dict[str, Part] = {}
+    elements: Dict[str, BoardElement] = {}
+    signals: Dict[str, Signal] = {}
+    wires = Wires()
+    vias = Vias()
+    polygons = Polygons()
+    plain = Plain()
+    # Children of a standalone library, kept in released form (see
+    # Library.release()) as they arrive
+    packages: Dict[str, bytes] = {}
+    symbols: Dict[str, bytes] = {}
+    devices: Dict[str, Device] = {}
+    parse_device = _device_parser(include)
+    paths = _STREAM_PATHS if include == SECTIONS else _stream_paths(include)
+    for path, elem in _iter_subtrees(source, paths, backend):
+        tail = path[2:]
+        if tail == ('library',):
+            return Library(
+                elem.attrib.get('name'), elem.attrib.get('urn', ''),
+                description,
+                _LazyMap.released('package', _identity, {}, packages),
+                _LazyMap.released('symbol', _identity, {}, symbols),
+                _LazyMap.released('deviceset', parse_device, devices, {}))
+        if tail == ('board',):
+            return Board(description, libraries, elements, signals, wires,
+                         vias, polygons, plain)
+        if tail == ('schematic',):
+            return Schematic(description, libraries, parts)
+        # Sections shared by boards and schematics, then library contents
+        section = tail[1:]
+        if section == ('description',):
+            description = elem.text
+        elif section == ('libraries', 'library') and parse_libraries:
+            # Built now: the subtree is cleared as soon as this returns
+            lib = Library.from_et(elem, include)
+            lib.release()
+            libraries[lib.ref] = lib
+        elif section == ('parts', 'part'):
+            part = Part.from_et(elem)
+            parts[part.name] = part
+        elif section == ('elements', 'element'):
+            board_elt = BoardElement.from_et(elem)
+            elements[board_elt.name] = board_elt
+        elif section == ('signals', 'signal'):
+            signal = Signal.from_et(elem, wires, vias, polygons)
+            signals[signal.name] = signal
+        elif section[0] == 'plain':
+            plain.append_et(elem)
+        elif section == ('packages', 'package'):
+            packages[elem.attrib['name']] = xmlbackend.tostring(elem)
+        elif section == ('symbols', 'symbol'):
+            symbols[elem.attrib['name']] = xmlbackend.tostring(elem)
+        elif section == ('devicesets', 'deviceset'):
+            device = parse_device(elem)
+            device.release()
+            devices[elem.attrib['name']] = device
+    raise ValueError('Corrupt or unhandled EAGLE file')
+
+
+def _build_library(chunk: bytes, backend: Optional[str],
+                   include: FrozenSet[str]) -> Library:
+    # Runs in a worker process. Every device is built here so the parent
+    # receives finished objects rather than XML to parse again.
+    library = Library.from_et(xmlbackend.fromstring(chunk, backend), include)
+    library.release()
+    return library
+
+
+def _parse_libraries(data: _Buffer, spans: List[LibrarySpan], jobs: int,
+                     backend: Optional[str], include: FrozenSet[str]) \
+        -> Dict[LibraryRef, Library]:
+    chunks = [bytes(data[span.start:span.end]) for span in spans]
+    libraries = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map() yields in submission order, so the result matches a serial
+        # parse regardless of which worker finishes first
+        for lib in executor.map(_build_library, chunks, repeat(backend),
+                                repeat(include)):
+            libraries[lib.ref] = lib
+    return libraries
+
+
+def _without_spans(data: _Buffer, spans: List[LibrarySpan]) -> bytes:
+    pieces = []
+    pos = 0
+    for span in spans:
+        pieces.append(data[pos:span.start])
+        pos = span.end
+    pieces.append(data[pos:])
+    return b''.join(pieces)
+
+
+def _count_model(model: Union[Board, Library, Schematic]) -> None:
+    # Only called while timings are recording: sizing the lazy maps builds
+    # their indexes
+    libraries = [model] if isinstance(model, Library) \
+        else list(model.libraries.values())
+    timing.count('libraries', len(libraries))
+    timing.count('devicesets', sum(len(lib.devices) for lib in libraries))
+    if isinstance(model, Schematic):
+        timing.count('parts', len(model.parts))
+    elif isinstance(model, Board):
+        timing.count('elements', len(model.elements))
+        timing.count('signals', len(model.signals))
+
+
+def parse_file(source: Source, streaming: bool=False,
+               cache: Optional['ParseCache']=None,
+               backend: Optional[str]=None, jobs: int=1,
+               include: Optional[Iterable[str]]=None) \
+        -> Union[Board, Library, Schematic]:
+    """Parse a board, library or schematic
+
+    include names the SECTIONS to build (sections they are nested in are
+    implied); the rest are skipped rather than built and thrown away, and
+    left empty in the result. Schematic.resolved only covers what was
+    built, so resolving parts needs 'parts' and 'technologies'.
+
+    A tree parse keeps the elements of library entries that haven't been
+    looked up yet, so they can be built on demand; Library.release() lets
+    go of them. A streaming parse builds every device up front and keeps
+    no elements.
+    """
+    sections = _sections(include)
+    if cache is None:
+        result = _parse_uncached(source, streaming, backend, jobs, sections)
+    else:
+        with timing.phase('read'):
+            data = _read_source(source)
+        version = PARSER_VERSION
+        if sections != SECTIONS:
+            version += ':' + ','.join(sorted(sections))
+        key = cache.make_key(data, version)
+        with timing.phase('cache'):
+            cached = cache.get(key)
+        if isinstance(cached, (Board, Library, Schematic)):
+            result = cached
+        else:
+            result = _parse_uncached(data, streaming, backend, jobs,
+                                     sections)
+            with timing.phase('cache'):
+                cache.put(key, result)
+    if timing.enabled():
+        _count_model(result)
+    return result
+
+
+def _parse_uncached(source: Source, streaming: bool, backend: Optional[str],
+                    jobs: int, include: FrozenSet[str]) \
+        -> Union[Board, Library, Schematic]:
+    libraries = None
+    skip_libraries = 'libraries' not in include and not streaming
+    if jobs > 1 or skip_libraries:
+        # Embedded libraries are cut out by byte range and either parsed by
+        # worker processes or, if not wanted, dropped before the XML parser
+        # sees them; the rest of the document is parsed here as usual.
+        with timing.phase('read'):
+            data = _read_source(source)
+        with timing.phase('scan'):
+            spans = library_spans(data)
+        if skip_libraries and spans:
+            libraries = {}
+            source = _without_spans(data, spans)
+        elif len(spans) > 1 and 'libraries' in include:
+            with timing.phase('libraries'):
+                libraries = _parse_libraries(data, spans, jobs, backend,
+                                             include)
+            source = _without_spans(data, spans)
+        else:
+            source = data
+    if streaming:
+        # XML parsing and model construction are interleaved
+        with timing.phase('stream'), _open_source(source) as f:
+            return _parse_streaming(f, backend, libraries, include)
+    with timing.phase('xml'):
+        type_, et, element = load_file(source, backend)
+    with timing.phase('build'):
+        if type_ == 'board':
+            return Board.from_et(element, libraries, include)
+        if type_ == 'library':
+            return Library.from_et(element, include)
+        if type_ == 'schematic':
+            return Schematic.from_et(element, libraries, include)
     assert False, "load_file returned unknown type"
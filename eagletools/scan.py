@@ -0,0 +1,146 @@
+"""Locate embedded libraries by byte offset without building a tree"""
+import html
+import mmap
+import re
+from typing import Dict, List, NamedTuple, NoReturn, Optional, Union
+from xml.parsers import expat
+
+_Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+_CONTAINERS = frozenset(['board', 'schematic'])
+
+# Markup that can hide tag-like text from a plain byte search
+_XML_DECLARATION = re.compile(rb'(?:\xef\xbb\xbf)?<\?xml[^>]*\?>')
+_OPAQUE = re.compile(rb'<!--|<!\[CDATA\[|<\?')
+_LIBRARIES_START = re.compile(rb'<libraries[\s/>]')
+_LIBRARIES_END = re.compile(rb'</libraries\s*>')
+_LIBRARY_START = re.compile(rb'<library[\s/>]')
+_LIBRARY_END = re.compile(rb'</library\s*>')
+_NAME_ATTR = re.compile(rb'\sname\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+
+class LibrarySpan(NamedTuple):
+    name: str
+    # Offsets of the '<library' start tag, the element's content, and one
+    # past the end tag, so data[start:end] is the whole element and
+    # data[body_start:body_end] is everything between its tags
+    start: int
+    body_start: int
+    body_end: int
+    end: int
+
+
+def _forbid_entities(*args: object) -> NoReturn:
+    raise ValueError('Entity declarations are not allowed')
+
+
+def _tag_end(data: _Buffer, pos: int) -> int:
+    """Return the offset just past the tag starting at pos"""
+    quote = None
+    for i in range(pos, len(data)):
+        c = data[i]
+        if quote is not None:
+            if c == quote:
+                quote = None
+        elif c in b'"\'':
+            quote = c
+        elif c == ord('>'):
+            return i + 1
+    raise ValueError('Unterminated tag at offset {}'.format(pos))
+
+
+def xml_declaration(data: _Buffer) -> bytes:
+    """Return the document's XML declaration (with any BOM), or b''"""
+    declaration = _XML_DECLARATION.match(data)
+    return declaration.group() if declaration else b''
+
+
+def library_spans(data: _Buffer) -> List[LibrarySpan]:
+    """Find the <library> elements embedded in a board or schematic"""
+    # EAGLE never writes comments, CDATA or processing instructions (beyond
+    # the XML declaration), so tags can be found with a byte search. Files
+    # that contain them get a full (slower) expat scan instead.
+    declaration = _XML_DECLARATION.match(data)
+    if _OPAQUE.search(data, declaration.end() if declaration else 0):
+        return _expat_library_spans(data)
+    return _regex_library_spans(data)
+
+
+def _regex_library_spans(data: _Buffer) -> List[LibrarySpan]:
+    section = _LIBRARIES_START.search(data)
+    if section is None:
+        return []
+    pos = _tag_end(data, section.start())
+    if data[pos - 2:pos] == b'/>':
+        return []
+    section_end = _LIBRARIES_END.search(data, pos)
+    if section_end is None:
+        raise ValueError('Unterminated <libraries> element')
+    limit = section_end.start()
+
+    spans: List[LibrarySpan] = []
+    while True:
+        match = _LIBRARY_START.search(data, pos, limit)
+        if match is None:
+            return spans
+        start = match.start()
+        body_start = _tag_end(data, start)
+        name_match = _NAME_ATTR.search(data, start, body_start)
+        name = ''
+        if name_match is not None:
+            raw = name_match.group(1)
+            if raw is None:
+                raw = name_match.group(2)
+            name = html.unescape(raw.decode('utf-8'))
+        if data[body_start - 2:body_start] == b'/>':
+            spans.append(LibrarySpan(name, start, body_start, body_start,
+                                     body_start))
+            pos = body_start
+            continue
+        end = _LIBRARY_END.search(data, body_start, limit)
+        if end is None:
+            raise ValueError('Unterminated <library> element')
+        spans.append(LibrarySpan(name, start, body_start, end.start(),
+                                 end.end()))
+        pos = end.end()
+
+
+def _expat_library_spans(data: _Buffer) -> List[LibrarySpan]:
+    parser = expat.ParserCreate()
+    parser.EntityDeclHandler = _forbid_entities
+    parser.UnparsedEntityDeclHandler = _forbid_entities
+    parser.ExternalEntityRefHandler = _forbid_entities
+
+    path: List[str] = []
+    spans: List[LibrarySpan] = []
+    current: Optional[LibrarySpan] = None
+
+    def start(name: str, attrs: Dict[str, str]) -> None:
+        nonlocal current
+        if (name == 'library' and len(path) == 4 and path[1] == 'drawing'
+                and path[2] in _CONTAINERS and path[3] == 'libraries'):
+            offset = parser.CurrentByteIndex
+            current = LibrarySpan(attrs.get('name', ''), offset,
+                                  _tag_end(data, offset), 0, 0)
+        path.append(name)
+
+    def end(name: str) -> None:
+        nonlocal current
+        path.pop()
+        if current is None or len(path) != 4:
+            return
+        offset = parser.CurrentByteIndex
+        if data[offset:offset + 2] == b'</':
+            span = current._replace(body_end=offset,
+                                    end=_tag_end(data, offset))
+        else:
+            # Empty-element tag: expat reports the offset past the tag
+            span = current._replace(body_start=offset, body_end=offset,
+                                    end=offset)
+        spans.append(span)
+        current = None
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(data, True)
+    return spans
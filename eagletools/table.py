@@ -0,0 +1,60 @@
+"""Streaming plain-text tables
+
+Rows are written as they are produced instead of being collected first.
+Column widths are taken from the headers and a bounded sample of leading
+rows, so memory use doesn't grow with the table and output starts at once.
+The layout follows tabulate's default 'simple' format.
+"""
+from itertools import chain, islice
+from typing import Iterable, Sequence, TextIO
+
+# Rows buffered to compute column widths
+SAMPLE_ROWS = 1000
+
+# Spaces between columns, and added to each header's width
+_PADDING = 2
+
+
+def _is_number(cell: str) -> bool:
+    try:
+        float(cell)
+    except ValueError:
+        return False
+    return True
+
+
+def _format_row(cells: Sequence[str], widths: Sequence[int],
+                numeric: Sequence[bool]) -> str:
+    padded = [cell.rjust(width) if right else cell.ljust(width)
+              for cell, width, right in zip(cells, widths, numeric)]
+    return (' ' * _PADDING).join(padded).rstrip() + '\n'
+
+
+def write_table(out: TextIO, headers: Sequence[str],
+                rows: Iterable[Sequence[str]],
+                sample: int=SAMPLE_ROWS) -> None:
+    """Write rows of strings to out as an aligned table
+
+    Cells in rows past the sample that are wider than their column push
+    the rest of that line right rather than reflowing the whole table.
+    Columns whose sampled cells are all numbers are right-aligned.
+    """
+    rows = iter(rows)
+    head = list(islice(rows, sample))
+
+    widths = [len(header) + _PADDING for header in headers]
+    numeric = [False] * len(headers)
+    seen = [False] * len(headers)
+    for row in head:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+            if cell:
+                numeric[i] = _is_number(cell) and (numeric[i] or not seen[i])
+                seen[i] = True
+
+    write = out.write
+    write(_format_row(headers, widths, numeric))
+    write(_format_row(['-' * width for width in widths], widths, numeric))
+    for row in chain(head, rows):
+        write(_format_row(row, widths, numeric))
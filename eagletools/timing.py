@@ -0,0 +1,144 @@
+"""Per-phase timing and counters
+
+Code marks phases with `with phase('xml'):` and tallies objects with
+count(); both do nothing unless a Timings is recording. To collect them:
+
+    timings = Timings()
+    with timings.record():
+        parse_file(path)
+    print(json.dumps(timings.as_dict()))
+
+Phases may nest (e.g. 'resolve' runs inside 'build'); each is reported
+with its own inclusive totals. Work done in worker processes is counted
+in the phase that waits for it, not broken down.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+_active: Optional['Timings'] = None
+
+
+class Timings:
+    def __init__(self) -> None:
+        # name -> [wall seconds, CPU seconds, calls], in first-seen order
+        self.phases: Dict[str, List[float]] = {}
+        self.counts: Dict[str, int] = {}
+        # Other figures to report alongside, e.g. cache statistics
+        self.extra: Dict[str, Any] = {}
+        self._previous: List[Optional[Timings]] = []
+        self._start = (0.0, 0.0)
+        self._total: Optional[List[float]] = None
+
+    def start(self) -> None:
+        """Start recording; prefer record() where a with block fits"""
+        global _active
+        self._previous.append(_active)
+        _active = self
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self) -> None:
+        global _active
+        wall, cpu = self._start
+        self._total = [time.perf_counter() - wall,
+                       time.process_time() - cpu, 1]
+        _active = self._previous.pop()
+
+    @contextmanager
+    def record(self) -> Iterator['Timings']:
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        totals = self.phases.setdefault(name, [0.0, 0.0, 0])
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += 1
+
+    def count(self, name: str, n: int=1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def as_dict(self) -> Dict[str, Any]:
+        phases = dict(self.phases)
+        if self._total is not None:
+            phases['total'] = self._total
+        result = {
+            'phases': {name: {'wall': wall, 'cpu': cpu, 'calls': int(calls)}
+                       for name, (wall, cpu, calls) in phases.items()},
+            'counts': dict(self.counts),
+        }
+        result.update(self.extra)
+        return result
+
+    def format(self) -> str:
+        data = self.as_dict()
+        lines = ['{:<12} {:>9} {:>9} {:>8}'.format(
+            'phase', 'wall s', 'cpu s', 'calls')]
+        for name, totals in data['phases'].items():
+            lines.append('{:<12} {:9.3f} {:9.3f} {:8d}'.format(
+                name, totals['wall'], totals['cpu'], totals['calls']))
+        if self.counts:
+            lines.append('counts: ' + ' '.join(
+                '{}={}'.format(name, n) for name, n in self.counts.items()))
+        for name, value in self.extra.items():
+            if isinstance(value, dict):
+                value = ' '.join('{}={}'.format(k, _format_number(v))
+                                 for k, v in value.items())
+            lines.append('{}: {}'.format(name, value))
+        return '\n'.join(lines)
+
+
+def _format_number(value: Any) -> str:
+    if isinstance(value, float):
+        return '{:.3f}'.format(value)
+    return str(value)
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    timings = _active
+    if timings is None:
+        yield
+        return
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - wall,
+                    time.process_time() - cpu)
+
+
+def count(name: str, n: int=1) -> None:
+    if _active is not None:
+        _active.count(name, n)
+
+
+def timed(name: str, func: Callable[..., T]) -> Callable[..., T]:
+    """Wrap func so each call is recorded as the named phase
+
+    Returns func itself when nothing is recording, so hot loops pay
+    nothing for it.
+    """
+    timings = _active
+    if timings is None:
+        return func
+
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.add(name, time.perf_counter() - wall,
+                        time.process_time() - cpu)
+    return wrapper
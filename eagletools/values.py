@@ -0,0 +1,133 @@
+"""Memoized component value normalization
+
+Schematics repeat the same few hundred values (10k, 100n, ...) thousands of
+times, so normalized forms are kept in a bounded LRU shared by every file
+processed in a run. The table can be saved to and loaded from a JSON file,
+normally in the parse cache directory, so later runs start warm; a saved
+table is only used with the exact hwpy code that produced it.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from hwpy.value import Value
+
+DEFAULT_MAX_SIZE = 4096
+
+# Bump if the stored format changes
+_FORMAT = 2
+
+# Normalized by _fingerprint() to catch behavior changes its source hash
+# can't see
+_PROBES = ('10k', '4k7', '100n', '0.1uF', '2.2u', '330p', '1M', '47',
+           '1R5', '10mH', '5%', 'DNP')
+
+
+def _normalize(value: str) -> str:
+    try:
+        normalized: str = Value.parse(value).to_str(True)
+    except ValueError:
+        return value
+    return normalized
+
+
+@lru_cache(maxsize=None)
+def _fingerprint() -> str:
+    # Identifies the normalization code: the source of every hwpy module
+    # loaded, and what it makes of the probe values. hwpy's version string
+    # won't do, since installs from git keep it across commits.
+    digest = hashlib.sha256()
+    for name in sorted(sys.modules):
+        if name != 'hwpy' and not name.startswith('hwpy.'):
+            continue
+        path = getattr(sys.modules[name], '__file__', None)
+        if not path:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                source = f.read()
+        except OSError:
+            continue
+        digest.update(name.encode('utf-8') + b'\0' + source + b'\0')
+    for probe in _PROBES:
+        digest.update(_normalize(probe).encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+class ValueNormalizer:
+    def __init__(self, max_size: int=DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._table: 'OrderedDict[str, str]' = OrderedDict()
+
+    def __call__(self, value: Optional[str]) -> str:
+        """Return value in canonical form, or unchanged if it can't be parsed"""
+        if not value:
+            return ''
+        table = self._table
+        normalized = table.get(value)
+        if normalized is not None:
+            self.hits += 1
+            table.move_to_end(value)
+            return normalized
+        self.misses += 1
+        normalized = _normalize(value)
+        table[value] = normalized
+        if len(table) > self.max_size:
+            table.popitem(last=False)
+        return normalized
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._table),
+        }
+
+    def load(self, path: str) -> None:
+        """Merge entries saved by save(); missing or stale files are ignored"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(saved, dict) or \
+                saved.get('format') != _FORMAT or \
+                saved.get('normalizer') != _fingerprint():
+            return
+        entries = saved.get('values')
+        if not isinstance(entries, list):
+            return
+        for entry in entries[-self.max_size:]:
+            if isinstance(entry, list) and len(entry) == 2 and \
+                    all(isinstance(x, str) for x in entry):
+                self._table.setdefault(entry[0], entry[1])
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        data = json.dumps({
+            'format': _FORMAT,
+            'normalizer': _fingerprint(),
+            # Least recently used first, so load() keeps the newest
+            'values': list(self._table.items()),
+        }, ensure_ascii=False)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
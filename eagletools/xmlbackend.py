@@ -0,0 +1,147 @@
+"""Pluggable XML parsing backends
+
+Two backends are supported: 'lxml', used when it is installed, and
+'defusedxml', the pure ElementTree fallback. The default can be forced with
+set_backend() or the EAGLETOOLS_XML_BACKEND environment variable. Both
+return objects exposing the ElementTree Element API, and both report
+malformed XML as xml.etree.ElementTree.ParseError.
+"""
+import os
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union, cast
+from xml.etree.ElementTree import Element, ElementTree, ParseError
+
+ENV_VAR = 'EAGLETOOLS_XML_BACKEND'
+
+BACKENDS = ('lxml', 'defusedxml')
+
+_Source = Union[TextIO, BinaryIO]
+
+_selected: Optional[str] = None
+
+
+def _have_lxml() -> bool:
+    try:
+        import lxml.etree  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS
+            if name != 'lxml' or _have_lxml()]
+
+
+def set_backend(name: Optional[str]) -> None:
+    """Force a backend for subsequent parses, or None to pick automatically"""
+    global _selected
+    if name is not None:
+        _check(name)
+    _selected = name
+
+
+def get_backend() -> str:
+    if _selected is not None:
+        return _selected
+    name = os.environ.get(ENV_VAR)
+    if name:
+        _check(name)
+        return name
+    return 'lxml' if _have_lxml() else 'defusedxml'
+
+
+def _check(name: str) -> None:
+    if name not in BACKENDS:
+        raise ValueError('Unknown XML backend {!r}'.format(name))
+    if name == 'lxml' and not _have_lxml():
+        raise ValueError('XML backend lxml requested but not installed')
+
+
+class _EncodingReader:
+    # lxml only reads bytes from file objects
+    def __init__(self, source: TextIO) -> None:
+        self._source = source
+
+    def read(self, size: int=-1) -> bytes:
+        return self._source.read(size).encode('utf-8')
+
+
+def _binary(source: _Source) -> Any:
+    if isinstance(source.read(0), str):
+        return _EncodingReader(cast(TextIO, source))
+    return source
+
+
+_LXML_OPTIONS = {
+    'resolve_entities': False,
+    'no_network': True,
+    'load_dtd': False,
+    'remove_comments': True,
+    'remove_pis': True,
+}
+
+
+@contextmanager
+def _lxml_errors() -> Iterator[None]:
+    # Callers catch ParseError whichever backend is in use
+    from lxml import etree
+    try:
+        yield
+    except etree.ParseError as e:
+        error = ParseError(str(e))
+        error.code = e.code
+        error.position = e.position
+        raise error from e
+
+
+def _iter_lxml(events: Iterable[Tuple[str, Element]]) \
+        -> Iterator[Tuple[str, Element]]:
+    with _lxml_errors():
+        yield from events
+
+
+def parse(source: _Source, backend: Optional[str]=None) -> ElementTree:
+    backend = backend or get_backend()
+    if backend == 'lxml':
+        from lxml import etree
+        parser = etree.XMLParser(**_LXML_OPTIONS)
+        with _lxml_errors():
+            return cast(ElementTree, etree.parse(_binary(source), parser))
+    from defusedxml.ElementTree import parse as parse_defused
+    return cast(ElementTree, parse_defused(source))
+
+
+def iterparse(source: _Source, events: Sequence[str],
+              backend: Optional[str]=None) \
+        -> Iterator[Tuple[str, Element]]:
+    backend = backend or get_backend()
+    if backend == 'lxml':
+        from lxml import etree
+        return _iter_lxml(etree.iterparse(_binary(source),
+                                          events=tuple(events),
+                                          **_LXML_OPTIONS))
+    from defusedxml.ElementTree import iterparse as iterparse_defused
+    return cast(Iterator[Tuple[str, Element]],
+                iterparse_defused(source, events=events))
+
+
+def fromstring(data: bytes, backend: Optional[str]=None) -> Element:
+    backend = backend or get_backend()
+    if backend == 'lxml':
+        from lxml import etree
+        parser = etree.XMLParser(**_LXML_OPTIONS)
+        with _lxml_errors():
+            return cast(Element, etree.fromstring(data, parser))
+    from defusedxml.ElementTree import fromstring as fromstring_defused
+    return cast(Element, fromstring_defused(data))
+
+
+def tostring(element: Element) -> bytes:
+    """Serialize an element from either backend as UTF-8"""
+    if isinstance(element, Element):
+        from xml.etree.ElementTree import tostring as tostring_et
+        data: bytes = tostring_et(element, encoding='utf-8')
+        return data
+    from lxml import etree
+    return cast(bytes, etree.tostring(element, encoding='utf-8'))
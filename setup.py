@@ -15,9 +15,12 @@ setup(
         'hwpy@git+ssh://git@github.com/drakedevel/hwpy@master',
         'tabulate>=0.7.7',
     ],
+    extras_require={
+        'lxml': ['lxml>=4.2'],
+    },
     entry_points={
         'console_scripts': [
-            'eagletools = eagletools.cli:cli'
+            'eagletools = eagletools.client:main'
         ],
     },
     zip_safe=False,